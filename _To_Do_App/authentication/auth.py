@@ -1,11 +1,13 @@
 from typing import Optional, Dict, Tuple
-from .models import User, UserRepository
 from .validation import Validator
+from .service import AuthService
 
 class AuthManager:
     def __init__(self):
         self.validator = Validator()
-        self.user_repo = UserRepository()
+        self.service = AuthService()
+        self.user_repo = self.service.user_repo
+        self.token: Optional[str] = None
 
     def register(self) -> Optional[Dict]:
         print("\n=== User Registration ===")
@@ -34,12 +36,12 @@ class AuthManager:
                 self.validator.validate_phone
             )
 
-            hashed_password = self.validator.hash_password(password)
-            new_user = User(first_name, last_name, email, hashed_password, phone)
-            self.user_repo.add_user(new_user)
+            new_user = self.service.register(
+                first_name, last_name, email, password, password, phone
+            )
             
             print("\nRegistration successful!")
-            return new_user.to_dict()
+            return new_user
             
         except Exception as e:
             print(f"\nRegistration failed: {str(e)}")
@@ -51,15 +53,12 @@ class AuthManager:
             email = input("Email: ").strip()
             password = input("Password: ")
             
-            user = self.user_repo.find_by_email(email)
+            user = self.service.login(email, password)
             if not user:
                 print("Invalid email or password")
                 return None
                 
-            if not self.validator.check_password(password, user["password"]):
-                print("Invalid email or password")
-                return None
-                
+            self.token = self.service.start_session(user)
             print(f"\nWelcome back, {user['first_name']}!")
             return user
             
@@ -67,6 +66,10 @@ class AuthManager:
             print(f"\nLogin failed: {str(e)}")
             return None
 
+    def logout(self) -> None:
+        self.service.logout(self.token)
+        self.token = None
+
     def update_profile(self, email: str) -> Optional[Dict]:
         print("\n=== Update Profile ===")
         try:
@@ -100,15 +103,11 @@ class AuthManager:
                 default=user['phone_number']
             )
 
-            updated_data = {
-                "first_name": new_first,
-                "last_name": new_last,
-                "phone_number": new_phone
-            }
-            
-            self.user_repo.update_user(email, updated_data)
+            updated_user = self.service.update_profile(
+                email, new_first, new_last, new_phone
+            )
             print("\nProfile updated successfully!")
-            return {**user, **updated_data}
+            return updated_user
             
         except Exception as e:
             print(f"\nProfile update failed: {str(e)}")
@@ -135,12 +134,7 @@ class AuthManager:
                 print(f"Input error: {str(e)}")
 
     def _validate_unique_email(self, email: str) -> Tuple[bool, str]:
-        is_valid, error = self.validator.validate_email(email)
-        if not is_valid:
-            return False, error
-        if self.user_repo.find_by_email(email):
-            return False, "Email already registered"
-        return True, ""
+        return self.service.validate_unique_email(email)
 
     def _get_valid_password(self) -> str:
         while True:
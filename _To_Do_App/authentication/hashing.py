@@ -0,0 +1,82 @@
+import os
+import threading
+from typing import TYPE_CHECKING, Optional
+from utils import metrics
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ThreadPoolExecutor
+
+BCRYPT_ROUNDS_ENV = "TODO_BCRYPT_ROUNDS"
+HASH_WORKERS_ENV = "TODO_HASH_WORKERS"
+DEFAULT_ROUNDS = 12
+
+
+class PasswordHasher:
+    def __init__(self, rounds: Optional[int] = None, max_workers: Optional[int] = None):
+        self.rounds = rounds or int(os.environ.get(BCRYPT_ROUNDS_ENV, DEFAULT_ROUNDS))
+        self.max_workers = max_workers or int(os.environ.get(HASH_WORKERS_ENV, os.cpu_count() or 1))
+        self._executor: Optional["ThreadPoolExecutor"] = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> "ThreadPoolExecutor":
+        with self._lock:
+            if self._executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="bcrypt"
+                )
+            return self._executor
+
+    @metrics.timed("bcrypt.hash")
+    def hash(self, password: str) -> str:
+        # bcrypt (and asyncio below) load on first use, keeping them off the startup path
+        import bcrypt
+        try:
+            return bcrypt.hashpw(password.encode(), bcrypt.gensalt(self.rounds)).decode()
+        except Exception as e:
+            raise Exception(f"Password hashing failed: {str(e)}")
+
+    @metrics.timed("bcrypt.verify")
+    def verify(self, password: str, hashed_password: str) -> bool:
+        import bcrypt
+        try:
+            return bcrypt.checkpw(password.encode(), hashed_password.encode())
+        except Exception as e:
+            raise Exception(f"Password verification failed: {str(e)}")
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        try:
+            return int(hashed_password.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+    def submit_hash(self, password: str) -> "Future":
+        return self.executor.submit(self.hash, password)
+
+    def submit_verify(self, password: str, hashed_password: str) -> "Future":
+        return self.executor.submit(self.verify, password, hashed_password)
+
+    async def hash_async(self, password: str) -> str:
+        import asyncio
+        return await asyncio.wrap_future(self.submit_hash(password))
+
+    async def verify_async(self, password: str, hashed_password: str) -> bool:
+        import asyncio
+        return await asyncio.wrap_future(self.submit_verify(password, hashed_password))
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+
+_default_hasher: Optional[PasswordHasher] = None
+
+
+def get_hasher() -> PasswordHasher:
+    global _default_hasher
+    if _default_hasher is None:
+        _default_hasher = PasswordHasher()
+    return _default_hasher
@@ -1,38 +1,66 @@
-import json
 from pathlib import Path
-from datetime import datetime
-from typing import Dict, List, Optional, TypeVar, Generic
+from typing import (TYPE_CHECKING, Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar,
+                    Generic)
+from utils.storage import Storage, create_storage
+from utils.helpers import encode_timestamp, format_timestamp, now_timestamp
+from utils import metrics
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
 
 T = TypeVar('T')
 
 class BaseModel:
+    __slots__ = ("_extra",)
+    fields: Tuple[str, ...] = ()
+
     def to_dict(self) -> Dict:
-        return {k: v for k, v in self.__dict__.items() if not k.startswith('_')}
+        data = {}
+        for field in self.fields:
+            try:
+                data[field] = getattr(self, field)
+            except AttributeError:
+                continue
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict):
+        model = cls.__new__(cls)
+        extra = {}
+        for key, value in data.items():
+            if key in cls.fields:
+                setattr(model, key, value)
+            else:
+                extra[key] = value
+        model._extra = extra or None
+        return model
 
 class BaseRepository(Generic[T]):
-    def __init__(self, file_path: str):
+    indexes: Tuple[str, ...] = ()
+    shard_field: Optional[str] = None
+
+    def __init__(self, file_path: str, storage: Optional[Storage] = None):
         self.file_path = Path(file_path)
         self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        self.storage = storage or create_storage(self.file_path, self.indexes,
+                                                 shard_field=self.shard_field)
 
+    @metrics.timed()
     def save(self, items: List[Dict]) -> None:
-        try:
-            with open(self.file_path, 'w', encoding='utf-8') as f:
-                json.dump(items, f, indent=4, ensure_ascii=False)
-        except (IOError, json.JSONDecodeError) as e:
-            raise Exception(f"Failed to save data: {str(e)}")
+        self.storage.save(items)
 
+    @metrics.timed()
     def load(self) -> List[Dict]:
-        try:
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except FileNotFoundError:
-            return []
-        except json.JSONDecodeError:
-            raise Exception("Invalid JSON data in storage file")
-        except Exception as e:
-            raise Exception(f"Failed to load data: {str(e)}")
+        return self.storage.load()
 
 class User(BaseModel):
+    __slots__ = ("first_name", "last_name", "email", "password", "phone_number",
+                 "is_active", "_created")
+    fields = ("first_name", "last_name", "email", "password", "phone_number",
+              "is_active", "created_at")
+
     def __init__(self, first_name: str, last_name: str, email: str, 
                  password: str, phone_number: str, is_active: bool = True):
         self.first_name = first_name
@@ -41,91 +69,101 @@ class User(BaseModel):
         self.password = password
         self.phone_number = phone_number
         self.is_active = is_active
-        self.created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self._created = now_timestamp()
+        self._extra = None
+
+    @property
+    def created_at(self) -> str:
+        return format_timestamp(self._created)
+
+    @created_at.setter
+    def created_at(self, value: str) -> None:
+        self._created = encode_timestamp(value)
 
 class UserRepository(BaseRepository):
+    indexes = ("email",)
+
     def __init__(self, file_path: str = "data/users.json"):
         super().__init__(file_path)
-
+        self._by_email: Dict[str, Dict] = {}
+        self._signature = None
+
+    def _email_index(self) -> Dict[str, Dict]:
+        signature = self.storage.signature()
+        if self._signature is None or signature != self._signature:
+            self._by_email = {}
+            for user in self.load():
+                self._by_email.setdefault(user["email"].casefold(), user)
+            self._signature = signature
+        return self._by_email
+
+    @staticmethod
+    def _public(user: Dict) -> Dict:
+        # Password hashes stay inside the repository
+        return {key: value for key, value in user.items() if key != "password"}
+
+    @metrics.timed()
     def find_by_email(self, email: str) -> Optional[Dict]:
         try:
-            users = self.load()
-            return next((user for user in users if user["email"].lower() == email.lower()), None)
+            user = self._email_index().get(email.casefold())
+            return self._public(user) if user else None
+        except Exception as e:
+            raise Exception(f"Error finding user: {str(e)}")
+
+    def _stored_hash(self, email: str) -> Optional[Tuple[str, str]]:
+        try:
+            user = self._email_index().get(email.casefold())
+            return (user["email"], user["password"]) if user else None
         except Exception as e:
             raise Exception(f"Error finding user: {str(e)}")
 
+    def verify_password(self, email: str, verify: Callable[[str], bool],
+                        rehash: Optional[Callable[[str], Optional[str]]] = None) -> Optional[Dict]:
+        stored = self._stored_hash(email)
+        if stored is None or not verify(stored[1]):
+            return None
+        new_hash = rehash(stored[1]) if rehash else None
+        if new_hash:
+            self.update_user(stored[0], {"password": new_hash})
+        return self.find_by_email(stored[0])
+
+    async def verify_password_async(self, email: str, verify: Callable[[str], Awaitable[bool]],
+                                    rehash: Optional[Callable[[str], Awaitable[Optional[str]]]] = None,
+                                    executor: Optional["Executor"] = None) -> Optional[Dict]:
+        import asyncio
+        # Lookups and writes go through the executor; verify and rehash run wherever they like
+        loop = asyncio.get_running_loop()
+        stored = await loop.run_in_executor(executor, self._stored_hash, email)
+        if stored is None or not await verify(stored[1]):
+            return None
+        new_hash = await rehash(stored[1]) if rehash else None
+        if new_hash:
+            await loop.run_in_executor(executor, self.update_user, stored[0], {"password": new_hash})
+        return await loop.run_in_executor(executor, self.find_by_email, stored[0])
+
+    @metrics.timed()
     def add_user(self, user: User) -> None:
         try:
-            users = self.load()
-            users.append(user.to_dict())
-            self.save(users)
+            with self.storage.lock():
+                index = self._email_index()
+                record = user.to_dict()
+                self.storage.insert(record)
+                index.setdefault(record["email"].casefold(), record)
+                self._signature = self.storage.signature()
         except Exception as e:
             raise Exception(f"Error adding user: {str(e)}")
 
+    @metrics.timed()
     def update_user(self, email: str, updated_data: Dict) -> None:
         try:
-            users = self.load()
-            user_index = next((i for i, u in enumerate(users) if u["email"] == email), None)
-            
-            if user_index is not None:
-                users[user_index] = {**users[user_index], **updated_data}
-                self.save(users)
+            with self.storage.lock():
+                index = self._email_index()
+                user = index.get(email.casefold())
+                if user is None:
+                    return
+                updated = self.storage.update({"email": user["email"]}, updated_data)
+                del index[email.casefold()]
+                index[updated["email"].casefold()] = updated
+                self._signature = self.storage.signature()
         except Exception as e:
             raise Exception(f"Error updating user: {str(e)}")
-
-class Task(BaseModel):
-    def __init__(self, title: str, description: str, priority: str, 
-                 status: str, due_date: str, owner: str):
-        self.title = title
-        self.description = description
-        self.priority = priority.lower()
-        self.status = status.lower()
-        self.due_date = due_date
-        self.owner = owner
-        self.created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-class TaskRepository(BaseRepository):
-    def __init__(self, file_path: str = "data/tasks.json"):
-        super().__init__(file_path)
-
-    def get_user_tasks(self, user_email: str) -> List[Dict]:
-        try:
-            tasks = self.load()
-            return [task for task in tasks if task["owner"] == user_email]
-        except Exception as e:
-            raise Exception(f"Error getting user tasks: {str(e)}")
-
-    def find_by_title(self, user_email: str, title: str) -> Optional[Dict]:
-        try:
-            tasks = self.load()
-            return next((task for task in tasks 
-                       if task["owner"] == user_email and task["title"].lower() == title.lower()), None)
-        except Exception as e:
-            raise Exception(f"Error finding task: {str(e)}")
-
-    def add_task(self, task: Task) -> None:
-        try:
-            tasks = self.load()
-            tasks.append(task.to_dict())
-            self.save(tasks)
-        except Exception as e:
-            raise Exception(f"Error adding task: {str(e)}")
-
-    def update_task(self, task_title: str, updated_data: Dict) -> None:
-        try:
-            tasks = self.load()
-            task_index = next((i for i, t in enumerate(tasks) if t["title"] == task_title), None)
-            
-            if task_index is not None:
-                tasks[task_index] = {**tasks[task_index], **updated_data}
-                self.save(tasks)
-        except Exception as e:
-            raise Exception(f"Error updating task: {str(e)}")
-
-    def delete_task(self, task_title: str) -> None:
-        try:
-            tasks = self.load()
-            tasks = [task for task in tasks if task["title"] != task_title]
-            self.save(tasks)
-        except Exception as e:
-            raise Exception(f"Error deleting task: {str(e)}")
\ No newline at end of file
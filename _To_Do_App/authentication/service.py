@@ -0,0 +1,128 @@
+import functools
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+from .models import User, UserRepository
+from .validation import Validator
+from .hashing import PasswordHasher, get_hasher
+from .session import SessionStore, get_session_store
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+
+class AuthService:
+    def __init__(self, user_repo: Optional[UserRepository] = None,
+                 hasher: Optional[PasswordHasher] = None,
+                 sessions: Optional[SessionStore] = None):
+        self.validator = Validator()
+        self.user_repo = user_repo or UserRepository()
+        self.hasher = hasher or get_hasher()
+        self._sessions = sessions
+
+    @property
+    def sessions(self) -> SessionStore:
+        # Built on first use, so commands that never touch sessions never read the key file
+        if self._sessions is None:
+            self._sessions = get_session_store()
+        return self._sessions
+
+    def register(self, first_name: str, last_name: str, email: str, password: str,
+                 confirm_password: str, phone_number: str) -> Dict:
+        self._validate_registration(first_name, last_name, email, password,
+                                    confirm_password, phone_number)
+        new_user = User(first_name, last_name, email, self.hasher.hash(password), phone_number)
+        return self._add_new_user(new_user)
+
+    async def register_async(self, first_name: str, last_name: str, email: str, password: str,
+                             confirm_password: str, phone_number: str,
+                             executor: Optional["Executor"] = None) -> Dict:
+        import asyncio
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(executor, functools.partial(
+            self._validate_registration, first_name, last_name, email, password,
+            confirm_password, phone_number
+        ))
+        hashed = await self.hasher.hash_async(password)
+        new_user = User(first_name, last_name, email, hashed, phone_number)
+        return await loop.run_in_executor(executor, self._add_new_user, new_user)
+
+    def _validate_registration(self, first_name: str, last_name: str, email: str, password: str,
+                               confirm_password: str, phone_number: str) -> None:
+        self._check(self.validator.validate_name(first_name, "First name"))
+        self._check(self.validator.validate_name(last_name, "Last name"))
+        self._check(self.validate_unique_email(email))
+        self._check(self.validator.validate_password(password, confirm_password))
+        self._check(self.validator.validate_phone(phone_number))
+
+    def _add_new_user(self, new_user: User) -> Dict:
+        with self.user_repo.storage.lock():
+            # Hashing happens outside the lock, so another registration may have won meanwhile
+            self._check(self.validate_unique_email(new_user.email))
+            self.user_repo.add_user(new_user)
+        return self.user_repo.find_by_email(new_user.email)
+
+    def login(self, email: str, password: str) -> Optional[Dict]:
+        def rehash(hashed: str) -> Optional[str]:
+            return self.hasher.hash(password) if self.hasher.needs_rehash(hashed) else None
+
+        return self.user_repo.verify_password(
+            email.strip(), functools.partial(self.hasher.verify, password), rehash
+        )
+
+    async def login_async(self, email: str, password: str,
+                          executor: Optional["Executor"] = None) -> Optional[Dict]:
+        async def rehash(hashed: str) -> Optional[str]:
+            if not self.hasher.needs_rehash(hashed):
+                return None
+            return await self.hasher.hash_async(password)
+
+        return await self.user_repo.verify_password_async(
+            email.strip(), functools.partial(self.hasher.verify_async, password), rehash, executor
+        )
+
+    def start_session(self, user: Dict) -> str:
+        return self.sessions.issue(user["email"])
+
+    def session_email(self, token: Optional[str]) -> Optional[str]:
+        return self.sessions.validate(token)
+
+    def session_user(self, token: Optional[str]) -> Optional[Dict]:
+        email = self.sessions.validate(token)
+        return self.user_repo.find_by_email(email) if email else None
+
+    def logout(self, token: Optional[str]) -> bool:
+        return self.sessions.revoke(token)
+
+    def update_profile(self, email: str, first_name: Optional[str] = None,
+                       last_name: Optional[str] = None,
+                       phone_number: Optional[str] = None) -> Dict:
+        user = self.user_repo.find_by_email(email)
+        if not user:
+            raise ValueError("User not found!")
+
+        updated_data = {}
+        if first_name is not None:
+            self._check(self.validator.validate_name(first_name, "First name"))
+            updated_data["first_name"] = first_name
+        if last_name is not None:
+            self._check(self.validator.validate_name(last_name, "Last name"))
+            updated_data["last_name"] = last_name
+        if phone_number is not None:
+            self._check(self.validator.validate_phone(phone_number))
+            updated_data["phone_number"] = phone_number
+
+        self.user_repo.update_user(email, updated_data)
+        return {**user, **updated_data}
+
+    def validate_unique_email(self, email: str) -> Tuple[bool, str]:
+        is_valid, error = self.validator.validate_email(email)
+        if not is_valid:
+            return False, error
+        if self.user_repo.find_by_email(email):
+            return False, "Email already registered"
+        return True, ""
+
+    @staticmethod
+    def _check(result: Tuple[bool, str]) -> None:
+        is_valid, error = result
+        if not is_valid:
+            raise ValueError(error)
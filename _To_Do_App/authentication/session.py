@@ -0,0 +1,147 @@
+import os
+import hmac
+import time
+import base64
+import hashlib
+import secrets
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+SESSION_SECRET_ENV = "TODO_SESSION_SECRET"
+SESSION_TTL_ENV = "TODO_SESSION_TTL"
+DEFAULT_KEY_PATH = "data/session.key"
+DEFAULT_TTL = 8 * 60 * 60
+DEFAULT_MAX_SESSIONS = 10_000
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def load_secret(key_path: str = DEFAULT_KEY_PATH) -> bytes:
+    secret = os.environ.get(SESSION_SECRET_ENV)
+    if secret:
+        return secret.encode()
+    path = Path(key_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if not path.exists():
+        # Written in full under a temporary name, then linked into place, so two processes
+        # starting together agree on one key and neither can read a half-written file
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(secrets.token_bytes(32).hex())
+                f.flush()
+                os.fsync(f.fileno())
+            os.link(tmp_path, path)
+        except FileExistsError:
+            pass
+        finally:
+            tmp_path.unlink(missing_ok=True)
+    secret = path.read_text(encoding='utf-8').strip()
+    if not secret:
+        raise Exception(f"Session key file is empty: {path}")
+    return bytes.fromhex(secret)
+
+
+class SessionStore:
+    # Tokens are "<expiry>.<nonce>.<email>.<signature>", so any process holding the secret can
+    # check one; the LRU only saves re-checking the signature and remembers logouts
+    def __init__(self, secret: Optional[bytes] = None, ttl: Optional[int] = None,
+                 max_sessions: int = DEFAULT_MAX_SESSIONS):
+        self.secret = secret or load_secret()
+        self.ttl = ttl or int(os.environ.get(SESSION_TTL_ENV, DEFAULT_TTL))
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+        self._revoked: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _sign(self, payload: str) -> str:
+        return _b64encode(hmac.new(self.secret, payload.encode(), hashlib.sha256).digest())
+
+    def _remember(self, token: str, email: str, expires: int) -> None:
+        self._sessions[token] = (email, expires)
+        self._sessions.move_to_end(token)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    def issue(self, email: str) -> str:
+        expires = int(time.time()) + self.ttl
+        payload = f"{expires:x}.{secrets.token_urlsafe(12)}.{_b64encode(email.encode())}"
+        token = f"{payload}.{self._sign(payload)}"
+        with self._lock:
+            self._remember(token, email, expires)
+        return token
+
+    def _check(self, token: str) -> Optional[Tuple[str, int]]:
+        try:
+            expires_hex, nonce, email_b64, signature = token.split(".")
+            expires = int(expires_hex, 16)
+            email = _b64decode(email_b64).decode()
+        except (ValueError, UnicodeDecodeError):
+            return None
+        if not hmac.compare_digest(signature, self._sign(f"{expires_hex}.{nonce}.{email_b64}")):
+            return None
+        return email, expires
+
+    def validate(self, token: Optional[str]) -> Optional[str]:
+        if not token:
+            return None
+        now = int(time.time())
+        with self._lock:
+            session = self._sessions.get(token)
+            if session is not None:
+                self._sessions.move_to_end(token)
+            elif token in self._revoked:
+                return None
+        if session is None:
+            session = self._check(token)
+            if session is None:
+                return None
+            with self._lock:
+                self._remember(token, *session)
+        email, expires = session
+        if expires <= now:
+            self.revoke(token)
+            return None
+        return email
+
+    def expires_at(self, token: str) -> Optional[int]:
+        session = self._sessions.get(token) or self._check(token)
+        return session[1] if session else None
+
+    def revoke(self, token: Optional[str]) -> bool:
+        if not token:
+            return False
+        now = int(time.time())
+        with self._lock:
+            session = self._sessions.pop(token, None) or self._check(token)
+            if session is None:
+                return False
+            if session[1] > now:
+                self._revoked[token] = session[1]
+            # Forget revocations once the tokens they block have expired anyway
+            for revoked, expires in list(self._revoked.items()):
+                if expires <= now:
+                    del self._revoked[revoked]
+        return True
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+
+_default_store: Optional[SessionStore] = None
+
+
+def get_session_store() -> SessionStore:
+    global _default_store
+    if _default_store is None:
+        _default_store = SessionStore()
+    return _default_store
@@ -1,41 +1,103 @@
 import re
-import bcrypt
-from datetime import datetime
-from typing import Tuple
+from datetime import date, datetime
+from typing import Callable, Dict, Iterable, List, Tuple
+from .hashing import get_hasher
+
+NAME_PATTERN = re.compile(r'^[a-zA-Z\s\-]+$')
+EMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$')
+PHONE_PATTERN = re.compile(r'^(?:\+20|0020)1[0125]\d{8}$')
+ISO_DATE_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+PRIORITIES = ("high", "medium", "low")
+STATUSES = ("to_do", "in_progress", "completed")
+
+
+def _name_error(name: str, field_name: str) -> str:
+    stripped = name.strip()
+    if not stripped:
+        return f"{field_name} is required"
+    if len(stripped) < 2 or len(stripped) > 50:
+        return f"{field_name} must be between 2-50 characters"
+    if not NAME_PATTERN.match(name):
+        return f"{field_name} should contain only English letters"
+    return ""
+
+
+def _email_error(email: str) -> str:
+    if not email.strip():
+        return "Email is required"
+    if not EMAIL_PATTERN.match(email):
+        return "Invalid email format (user@example.com)"
+    return ""
+
+
+def _phone_error(phone: str) -> str:
+    if not phone.strip():
+        return "Phone is required"
+    if not PHONE_PATTERN.match(phone):
+        return "Invalid Egyptian phone number (start with +20 or 0020)"
+    return ""
+
+
+def _date_error(date_str: str, today: date) -> str:
+    try:
+        if ISO_DATE_PATTERN.match(date_str):
+            date_obj = date.fromisoformat(date_str)
+        else:
+            date_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
+    except ValueError:
+        return "Invalid date format (YYYY-MM-DD)"
+    if date_obj <= today:
+        return "Date must be in the future"
+    return ""
+
+
+def _title_error(title: str) -> str:
+    return "" if title.strip() else "Title is required"
+
+
+def _priority_error(priority: str) -> str:
+    return "" if priority.lower() in PRIORITIES else "Invalid priority (High/Medium/Low)"
+
+
+def _status_error(status: str) -> str:
+    return "" if status.lower() in STATUSES else "Invalid status (To_Do/In_Progress/Completed)"
+
+
+def _field_checks(today: date) -> Dict[str, Callable[[str], str]]:
+    return {
+        "first_name": lambda value: _name_error(value, "First name"),
+        "last_name": lambda value: _name_error(value, "Last name"),
+        "email": _email_error,
+        "phone_number": _phone_error,
+        "title": _title_error,
+        "priority": _priority_error,
+        "status": _status_error,
+        "due_date": lambda value: _date_error(value, today),
+    }
 
 class Validator:
     @staticmethod
     def validate_name(name: str, field_name: str) -> Tuple[bool, str]:
         try:
-            if not name.strip():
-                return False, f"{field_name} is required"
-            if len(name.strip()) < 2 or len(name.strip()) > 50:
-                return False, f"{field_name} must be between 2-50 characters"
-            if not re.match(r'^[a-zA-Z\s\-]+$', name):
-                return False, f"{field_name} should contain only English letters"
-            return True, ""
+            error = _name_error(name, field_name)
+            return not error, error
         except Exception as e:
             return False, f"Validation error: {str(e)}"
 
     @staticmethod
     def validate_email(email: str) -> Tuple[bool, str]:
         try:
-            if not email.strip():
-                return False, "Email is required"
-            if not re.match(r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$', email):
-                return False, "Invalid email format (user@example.com)"
-            return True, ""
+            error = _email_error(email)
+            return not error, error
         except Exception as e:
             return False, f"Validation error: {str(e)}"
 
     @staticmethod
     def validate_phone(phone: str) -> Tuple[bool, str]:
         try:
-            if not phone.strip():
-                return False, "Phone is required"
-            if not re.match(r'^(?:\+20|0020)1[0125]\d{8}$', phone):
-                return False, "Invalid Egyptian phone number (start with +20 or 0020)"
-            return True, ""
+            error = _phone_error(phone)
+            return not error, error
         except Exception as e:
             return False, f"Validation error: {str(e)}"
 
@@ -57,25 +119,48 @@ class Validator:
     @staticmethod
     def validate_date(date_str: str) -> Tuple[bool, str]:
         try:
-            date_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
-            if date_obj <= datetime.now().date():
-                return False, "Date must be in the future"
-            return True, ""
-        except ValueError:
-            return False, "Invalid date format (YYYY-MM-DD)"
+            error = _date_error(date_str, date.today())
+            return not error, error
         except Exception as e:
             return False, f"Validation error: {str(e)}"
 
     @staticmethod
-    def hash_password(password: str) -> str:
+    def validate_priority(priority: str) -> Tuple[bool, str]:
         try:
-            return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+            error = _priority_error(priority)
+            return not error, error
         except Exception as e:
-            raise Exception(f"Password hashing failed: {str(e)}")
+            return False, f"Validation error: {str(e)}"
 
     @staticmethod
-    def check_password(password: str, hashed_password: str) -> bool:
+    def validate_status(status: str) -> Tuple[bool, str]:
         try:
-            return bcrypt.checkpw(password.encode(), hashed_password.encode())
+            error = _status_error(status)
+            return not error, error
         except Exception as e:
-            raise Exception(f"Password verification failed: {str(e)}")
\ No newline at end of file
+            return False, f"Validation error: {str(e)}"
+
+    @staticmethod
+    def validate_many(records: Iterable[Dict]) -> Dict[str, List[str]]:
+        records = records if isinstance(records, list) else list(records)
+        checks = _field_checks(date.today())
+        errors: Dict[str, List[str]] = {}
+        for i, record in enumerate(records):
+            for field, value in record.items():
+                check = checks.get(field)
+                if check is None:
+                    continue
+                error = check(value) if isinstance(value, str) else f"{field} must be a string"
+                if error:
+                    if field not in errors:
+                        errors[field] = [""] * len(records)
+                    errors[field][i] = error
+        return errors
+
+    @staticmethod
+    def hash_password(password: str) -> str:
+        return get_hasher().hash(password)
+
+    @staticmethod
+    def check_password(password: str, hashed_password: str) -> bool:
+        return get_hasher().verify(password, hashed_password)
\ No newline at end of file
@@ -0,0 +1,30 @@
+import argparse
+import time
+from concurrent.futures import wait
+from authentication.hashing import PasswordHasher
+
+
+def run(pool_sizes, logins: int, rounds: int) -> None:
+    password = "Benchmark123"
+    hashed = PasswordHasher(rounds=rounds, max_workers=1).hash(password)
+
+    print(f"bcrypt cost {rounds}, {logins} logins per run")
+    print(f"{'workers':>8} {'seconds':>10} {'logins/sec':>12}")
+    for workers in pool_sizes:
+        hasher = PasswordHasher(rounds=rounds, max_workers=workers)
+        hasher.verify(password, hashed)
+        start = time.perf_counter()
+        futures = [hasher.submit_verify(password, hashed) for _ in range(logins)]
+        wait(futures)
+        elapsed = time.perf_counter() - start
+        hasher.shutdown()
+        print(f"{workers:>8} {elapsed:>10.3f} {logins / elapsed:>12.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure bcrypt login throughput per pool size")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=12)
+    args = parser.parse_args()
+    run(args.workers, args.logins, args.rounds)
@@ -0,0 +1,131 @@
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+APP_ROOT = Path(__file__).resolve().parent.parent
+PASSWORD = "Benchmark123"
+
+
+class Client:
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.token: Optional[str] = None
+        self._next_id = 0
+
+    @classmethod
+    async def connect(cls, host: str, port: int) -> "Client":
+        reader, writer = await asyncio.open_connection(host, port, limit=1 << 22)
+        return cls(reader, writer)
+
+    async def call(self, action: str, **params) -> object:
+        self._next_id += 1
+        request = {"id": self._next_id, "action": action, "token": self.token, **params}
+        self.writer.write(json.dumps(request).encode() + b"\n")
+        await self.writer.drain()
+        response = json.loads(await self.reader.readline())
+        if not response["ok"]:
+            raise RuntimeError(f"{action} failed: {response['error']}")
+        return response["result"]
+
+    async def close(self) -> None:
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+async def run_client(number: int, host: str, port: int, requests: int,
+                     latencies: Dict[str, List[float]]) -> None:
+    client = await Client.connect(host, port)
+    email = f"load{number}-{os.getpid()}@bench.example.com"
+    await client.call("register", first_name="Load", last_name="Tester", email=email,
+                      password=PASSWORD, phone_number="+201012345678")
+    client.token = (await client.call("login", email=email, password=PASSWORD))["token"]
+
+    due = (date.today() + timedelta(days=3)).isoformat()
+    # A read-heavy mix: one write for every three reads
+    mix: List[Tuple[str, Dict]] = [
+        ("create_task", {"title": "load test task", "description": "generated", "due_date": due}),
+        ("list_tasks", {}),
+        ("search_tasks", {"term": "load"}),
+        ("list_tasks", {"filters": {"priority": "medium", "sort": "due_date"}}),
+    ]
+    for i in range(requests):
+        action, params = mix[i % len(mix)]
+        started = time.perf_counter()
+        await client.call(action, **params)
+        latencies.setdefault(action, []).append(time.perf_counter() - started)
+    await client.close()
+
+
+def percentile(samples: List[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def run(host: str, port: int, clients: int, requests: int) -> None:
+    latencies: Dict[str, List[float]] = {}
+    started = time.perf_counter()
+    await asyncio.gather(*(run_client(n, host, port, requests, latencies) for n in range(clients)))
+    elapsed = time.perf_counter() - started
+
+    all_samples = [sample for samples in latencies.values() for sample in samples]
+    print(f"{clients} clients x {requests} requests in {elapsed:.2f}s "
+          f"(plus one register and login each)")
+    print(f"{'action':<14} {'count':>7} {'p50_ms':>9} {'p99_ms':>9}")
+    for action, samples in sorted(latencies.items()):
+        print(f"{action:<14} {len(samples):>7} {percentile(samples, 0.5) * 1e3:>9.2f} "
+              f"{percentile(samples, 0.99) * 1e3:>9.2f}")
+    print(f"{'all':<14} {len(all_samples):>7} {percentile(all_samples, 0.5) * 1e3:>9.2f} "
+          f"{percentile(all_samples, 0.99) * 1e3:>9.2f}")
+    print(f"throughput: {len(all_samples) / elapsed:.1f} requests/sec")
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def spawn_server(port: int, data_dir: str) -> subprocess.Popen:
+    env = {**os.environ, "PYTHONPATH": str(APP_ROOT)}
+    process = subprocess.Popen([sys.executable, "-m", "server", "--port", str(port)],
+                               cwd=data_dir, env=env, stdout=subprocess.PIPE)
+    # The server prints one line once it is listening
+    process.stdout.readline()
+    return process
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate load against the To-Do JSON server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="target a running server instead of spawning one")
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--requests", type=int, default=200, help="requests per client")
+    args = parser.parse_args(argv)
+
+    if args.port:
+        asyncio.run(run(args.host, args.port, args.clients, args.requests))
+        return 0
+
+    with tempfile.TemporaryDirectory(prefix="todo-load-") as data_dir:
+        port = free_port()
+        process = spawn_server(port, data_dir)
+        try:
+            asyncio.run(run("127.0.0.1", port, args.clients, args.requests))
+        finally:
+            process.terminate()
+            process.wait()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
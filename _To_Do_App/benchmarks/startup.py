@@ -0,0 +1,108 @@
+import os
+import sys
+import json
+import shutil
+import argparse
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+APP_ROOT = Path(__file__).resolve().parent.parent
+# Start the interactive app and pick "Exit" from the first menu
+EXIT_INPUT = "3\n"
+
+
+def parse_importtime(stderr: str) -> Dict[str, int]:
+    # "import time: self [us] | cumulative | imported package", nesting shown by indentation
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, self_us, total_us, name = (part.strip() for part in line.replace(":", "|", 1).split("|"))
+        cumulative[name] = int(total_us)
+    return cumulative
+
+
+def run_app(data_dir: str, importtime: bool = False) -> subprocess.CompletedProcess:
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command.append(str(APP_ROOT / "main.py"))
+    env = {**os.environ, "PYTHONPATH": str(APP_ROOT)}
+    return subprocess.run(command, input=EXIT_INPUT, cwd=data_dir, env=env,
+                          capture_output=True, text=True, check=True)
+
+
+def wall_times(command: List[str], runs: int, **kwargs) -> List[float]:
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(command, capture_output=True, text=True, check=True, **kwargs)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def measure(runs: int, top: int) -> Dict:
+    with tempfile.TemporaryDirectory(prefix="todo-startup-") as data_dir:
+        source = APP_ROOT / "data"
+        if source.exists():
+            shutil.copytree(source, Path(data_dir) / "data")
+        env = {**os.environ, "PYTHONPATH": str(APP_ROOT)}
+        # Warm the bytecode cache so every run measures the same thing
+        run_app(data_dir)
+
+        interpreter = wall_times([sys.executable, "-c", "pass"], runs)
+        app = wall_times([sys.executable, str(APP_ROOT / "main.py")], runs,
+                         input=EXIT_INPUT, cwd=data_dir, env=env)
+        imports = [parse_importtime(run_app(data_dir, importtime=True).stderr) for _ in range(runs)]
+
+    medians = {name: statistics.median(sample.get(name, 0) for sample in imports)
+               for name in imports[0]}
+    heaviest = sorted(medians.items(), key=lambda item: -item[1])[:top]
+    return {
+        "runs": runs,
+        "interpreter_ms": round(statistics.median(interpreter) * 1e3, 2),
+        "app_ms": round(statistics.median(app) * 1e3, 2),
+        "startup_ms": round((statistics.median(app) - statistics.median(interpreter)) * 1e3, 2),
+        "modules": len(medians),
+        "heaviest": [{"module": name, "cumulative_ms": round(us / 1e3, 2)} for name, us in heaviest],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure cold start of the interactive app")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=15, help="heaviest imports to list")
+    parser.add_argument("--output", help="write the results as JSON")
+    parser.add_argument("--baseline", help="JSON from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="percent slowdown of startup_ms that counts as a regression")
+    args = parser.parse_args(argv)
+
+    result = measure(args.runs, args.top)
+    print(f"interpreter alone   {result['interpreter_ms']:>8} ms")
+    print(f"app to first menu   {result['app_ms']:>8} ms")
+    print(f"startup overhead    {result['startup_ms']:>8} ms")
+    print(f"modules imported    {result['modules']:>8}")
+    print(f"\n{'module':<40} {'cumulative_ms':>14}")
+    for row in result["heaviest"]:
+        print(f"{row['module']:<40} {row['cumulative_ms']:>14}")
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2) + "\n", encoding="utf-8")
+
+    if not args.baseline:
+        return 0
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    change = result["startup_ms"] / baseline["startup_ms"] - 1 if baseline["startup_ms"] else 0.0
+    regression = change > args.threshold / 100
+    print(f"\nstartup {baseline['startup_ms']} ms -> {result['startup_ms']} ms ({change:+.1%})"
+          f"{'  REGRESSION' if regression else ''}")
+    return 1 if regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,96 @@
+import os
+import sys
+import json
+import argparse
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+APP_ROOT = Path(__file__).resolve().parent.parent
+# Environment for each storage layout the repository can run on
+MODES = {
+    "json": {},
+    "json-journal": {"TODO_JOURNAL": "1"},
+    "json-streaming": {"TODO_STREAMING": "1"},
+    "json-streaming-journal": {"TODO_STREAMING": "1", "TODO_JOURNAL": "1"},
+    "jsonl": {"TODO_JSON_FORMAT": "jsonl"},
+    "sqlite": {"TODO_STORAGE": "sqlite"},
+    "sharded": {"TODO_SHARDS": "8"},
+}
+MODE_VARIABLES = ("TODO_STORAGE", "TODO_JOURNAL", "TODO_STREAMING", "TODO_JSON_FORMAT",
+                  "TODO_SHARDS")
+
+
+def worker(number: int, count: int) -> None:
+    from tasks.models import Task, TaskRepository
+
+    repo = TaskRepository()
+    # Owners rotate, so every writer contends with the others for the same files and shards
+    for i in range(count):
+        owner = f"user{(number + i) % 4}@example.com"
+        repo.add_task(Task(f"task {number}-{i}", "", "medium", "to_do", "", owner))
+
+
+def count_tasks() -> None:
+    from tasks.models import TaskRepository
+
+    tasks = TaskRepository().load()
+    print(json.dumps({"tasks": len(tasks), "ids": len({task["id"] for task in tasks}),
+                      "titles": len({task["title"] for task in tasks})}))
+
+
+def run_mode(mode: str, processes: int, count: int) -> Dict:
+    env = {key: value for key, value in os.environ.items() if key not in MODE_VARIABLES}
+    env.update(MODES[mode], PYTHONPATH=str(APP_ROOT))
+    script = str(Path(__file__).resolve())
+    with tempfile.TemporaryDirectory(prefix="todo-stress-") as data_dir:
+        started = time.perf_counter()
+        workers = [subprocess.Popen([sys.executable, script, "--worker", str(number),
+                                     "--count", str(count)], cwd=data_dir, env=env)
+                   for number in range(processes)]
+        failed = sum(1 for process in workers if process.wait() != 0)
+        elapsed = time.perf_counter() - started
+        counted = json.loads(subprocess.run([sys.executable, script, "--count-tasks"],
+                                            cwd=data_dir, env=env, capture_output=True,
+                                            text=True, check=True).stdout)
+    expected = processes * count
+    return {
+        "mode": mode,
+        "expected": expected,
+        **counted,
+        "failed_workers": failed,
+        "seconds": round(elapsed, 2),
+        "ok": not failed and counted["tasks"] == counted["ids"] == counted["titles"] == expected,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check that concurrent writers lose no tasks")
+    parser.add_argument("--processes", type=int, default=8)
+    parser.add_argument("--count", type=int, default=30, help="add_task calls per process")
+    parser.add_argument("--mode", action="append", choices=list(MODES),
+                        help="storage layout to test (default: all)")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--count-tasks", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker is not None:
+        worker(args.worker, args.count)
+        return 0
+    if args.count_tasks:
+        count_tasks()
+        return 0
+
+    print(f"{'mode':<24} {'expected':>8} {'stored':>8} {'unique':>8} {'seconds':>8}")
+    results = [run_mode(mode, args.processes, args.count) for mode in args.mode or MODES]
+    for result in results:
+        print(f"{result['mode']:<24} {result['expected']:>8} {result['tasks']:>8} "
+              f"{result['ids']:>8} {result['seconds']:>8}"
+              f"{'' if result['ok'] else '  LOST WRITES'}")
+    return 0 if all(result["ok"] for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,277 @@
+import os
+import sys
+import json
+import random
+import secrets
+import argparse
+import platform
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from authentication.hashing import PasswordHasher, DEFAULT_ROUNDS, BCRYPT_ROUNDS_ENV
+from authentication.models import UserRepository
+from authentication.service import AuthService
+from authentication.session import SessionStore
+from tasks.models import Task, TaskRepository
+from tasks.query import TaskQuery
+from tasks.service import TaskService
+from utils.helpers import format_timestamp, now_timestamp
+from utils.storage import (STORAGE_BACKEND_ENV, JOURNAL_ENV, STREAMING_ENV, JSON_FORMAT_ENV,
+                           SHARDS_ENV, create_storage)
+
+SCALES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+TASKS_PER_USER = 50
+PASSWORD = "Benchmark123"
+WORDS = ("report", "invoice", "meeting", "groceries", "dentist", "deploy", "review", "budget",
+         "laundry", "workout", "birthday", "taxes", "garden", "backup", "release", "interview")
+PRIORITIES = ("high", "medium", "low")
+STATUSES = ("to_do", "in_progress", "completed")
+
+
+def parse_scale(value: str) -> int:
+    value = value.lower()
+    if value in SCALES:
+        return SCALES[value]
+    try:
+        return int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid scale: {value}")
+
+
+def user_email(number: int) -> str:
+    return f"user{number}@bench.example.com"
+
+
+def _storage(repository, path: Path):
+    # The storage the repository will open, so every layout under test gets the dataset
+    return create_storage(str(path), repository.indexes, shard_field=repository.shard_field)
+
+
+def generate(directory: Path, task_count: int, password_hash: str, seed: int = 0) -> int:
+    rng = random.Random(seed)
+    user_count = max(1, task_count // TASKS_PER_USER)
+    created = format_timestamp(now_timestamp())
+    today = date.today()
+    id_base = time.time_ns() // 1_000_000
+
+    _storage(UserRepository, directory / "users.json").save(({
+        "first_name": "Bench",
+        "last_name": "User",
+        "email": user_email(number),
+        "password": password_hash,
+        "phone_number": "+201012345678",
+        "is_active": True,
+        "created_at": created,
+    } for number in range(user_count)))
+
+    def tasks():
+        for number in range(task_count):
+            words = rng.sample(WORDS, 3)
+            yield {
+                "id": f"{id_base + number:011x}{rng.getrandbits(32):08x}",
+                "title": " ".join(words[:2]),
+                "description": f"Remember the {words[2]} before the deadline",
+                "priority": rng.choice(PRIORITIES),
+                "status": rng.choice(STATUSES),
+                "due_date": (today + timedelta(days=rng.randint(-30, 60))).isoformat(),
+                "owner": user_email(rng.randrange(user_count)),
+                "created_at": created,
+            }
+
+    _storage(TaskRepository, directory / "tasks.json").save(tasks())
+    return user_count
+
+
+def measure(operation: Callable[[int], object], iterations: int) -> Dict:
+    started = time.perf_counter()
+    operation(0)
+    first = time.perf_counter() - started
+
+    samples = []
+    for i in range(1, iterations + 1):
+        started = time.perf_counter()
+        operation(i)
+        samples.append(time.perf_counter() - started)
+    samples.sort()
+    median = statistics.median(samples)
+    return {
+        "iterations": iterations,
+        "first_us": round(first * 1e6, 1),
+        "median_us": round(median * 1e6, 1),
+        "mean_us": round(statistics.fmean(samples) * 1e6, 1),
+        "p95_us": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1e6, 1),
+        "ops_per_sec": round(1 / median, 1) if median else None,
+    }
+
+
+def run_scale(task_count: int, iterations: int, login_iterations: int, rounds: int,
+              password_hash: str, only: Optional[List[str]] = None) -> Dict:
+    with tempfile.TemporaryDirectory(prefix="todo-bench-") as tmp:
+        directory = Path(tmp)
+        started = time.perf_counter()
+        user_count = generate(directory, task_count, password_hash)
+        generated = time.perf_counter() - started
+
+        started = time.perf_counter()
+        task_repo = TaskRepository(str(directory / "tasks.json"))
+        user_repo = UserRepository(str(directory / "users.json"))
+        opened = time.perf_counter() - started
+
+        hasher = PasswordHasher(rounds=rounds, max_workers=1)
+        auth = AuthService(user_repo, hasher, SessionStore(secrets.token_bytes(32)))
+        tasks = TaskService(task_repo)
+        rng = random.Random(1)
+        emails = [user_email(rng.randrange(user_count)) for _ in range(iterations + 1)]
+        owner = emails[0]
+        token = auth.sessions.issue(owner)
+        created: List[str] = []
+
+        def add_task(i: int) -> None:
+            task = Task(f"bench task {i}", "added by the benchmark", "medium", "to_do",
+                        (date.today() + timedelta(days=7)).isoformat(), owner)
+            task_repo.add_task(task)
+            created.append(task.id)
+
+        benches = {
+            "get_user_tasks": (lambda i: task_repo.get_user_tasks(emails[i]), iterations),
+            "find_by_email": (lambda i: user_repo.find_by_email(emails[i]), iterations),
+            "search": (lambda i: task_repo.search_tasks(emails[i], WORDS[i % len(WORDS)]),
+                       iterations),
+            "filter": (lambda i: task_repo.query_tasks(
+                emails[i], TaskQuery(priority="high", exclude_status="completed", sort="due_date")
+            ), iterations),
+            "reminders": (lambda i: tasks.get_reminders(emails[i]), iterations),
+            "stats": (lambda i: task_repo.get_stats(emails[i]).summary(), iterations),
+            "stats_all": (lambda i: task_repo.get_stats().summary(), iterations),
+            "add_task": (add_task, iterations),
+            "update_task": (lambda i: task_repo.update_task(
+                owner, created[i % len(created)], {"status": "in_progress"}
+            ), iterations),
+            "delete_task": (lambda i: task_repo.delete_task(owner, created.pop()), iterations),
+            "login": (lambda i: auth.login(emails[i % len(emails)], PASSWORD), login_iterations),
+            "session_user": (lambda i: auth.session_user(token), iterations),
+        }
+
+        results = {"users": user_count, "tasks": task_count,
+                   "generate_s": round(generated, 3), "open_s": round(opened, 3)}
+        for name, (operation, count) in benches.items():
+            if only and name not in only:
+                continue
+            if name in ("update_task", "delete_task"):
+                # Mutate tasks the benchmark added itself; one extra for the untimed first call
+                while len(created) < count + 1:
+                    add_task(len(created))
+            results[name] = measure(operation, max(count, 1))
+        hasher.shutdown()
+        return results
+
+
+def run(scales: List[int], output: str, iterations: int, login_iterations: int,
+        rounds: int, only: Optional[List[str]] = None) -> Dict:
+    password_hash = PasswordHasher(rounds=rounds, max_workers=1).hash(PASSWORD)
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "started": format_timestamp(now_timestamp()),
+            "bcrypt_rounds": rounds,
+            "env": {name: os.environ.get(name) for name in (
+                STORAGE_BACKEND_ENV, JOURNAL_ENV, STREAMING_ENV, JSON_FORMAT_ENV, SHARDS_ENV
+            ) if os.environ.get(name)},
+        },
+        "results": {},
+    }
+    for task_count in scales:
+        print(f"Running {task_count} tasks...", file=sys.stderr)
+        report["results"][str(task_count)] = run_scale(task_count, iterations, login_iterations,
+                                                       rounds, password_hash, only)
+        # Write as we go so a long 1M run still leaves partial results behind
+        write_report(output, report)
+    return report
+
+
+def write_report(output: str, report: Dict) -> None:
+    Path(output).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> List[Dict]:
+    rows = []
+    for scale, benches in current["results"].items():
+        for name, result in benches.items():
+            before = baseline["results"].get(scale, {}).get(name)
+            if not isinstance(result, dict) or not isinstance(before, dict):
+                continue
+            if not before["median_us"]:
+                continue
+            change = result["median_us"] / before["median_us"] - 1
+            rows.append({
+                "scale": scale,
+                "bench": name,
+                "baseline_us": before["median_us"],
+                "current_us": result["median_us"],
+                "change": change,
+                "regression": change > threshold,
+            })
+    return rows
+
+
+def print_report(report: Dict) -> None:
+    for scale, benches in report["results"].items():
+        print(f"\n{benches['tasks']} tasks, {benches['users']} users "
+              f"(generate {benches['generate_s']}s, open {benches['open_s']}s)")
+        print(f"{'bench':<16} {'first_us':>12} {'median_us':>12} {'p95_us':>12} {'ops/sec':>12}")
+        for name, result in benches.items():
+            if isinstance(result, dict):
+                print(f"{name:<16} {result['first_us']:>12} {result['median_us']:>12} "
+                      f"{result['p95_us']:>12} {result['ops_per_sec']:>12}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark repository, service and auth hot paths")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="generate synthetic data and time each operation")
+    run_parser.add_argument("--scales", type=parse_scale, nargs="+",
+                            default=[SCALES["1k"], SCALES["10k"]],
+                            help="task counts: 1k, 10k, 100k, 1m or a number")
+    run_parser.add_argument("--output", default="benchmark-results.json")
+    run_parser.add_argument("--iterations", type=int, default=50)
+    run_parser.add_argument("--login-iterations", type=int, default=5)
+    run_parser.add_argument("--rounds", type=int,
+                            default=int(os.environ.get(BCRYPT_ROUNDS_ENV, DEFAULT_ROUNDS)))
+    run_parser.add_argument("--only", nargs="+", help="run only these benchmarks")
+
+    compare_parser = commands.add_parser("compare", help="flag regressions between two runs")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=10.0,
+                                help="percent slowdown of the median that counts as a regression")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        report = run(args.scales, args.output, args.iterations, args.login_iterations,
+                     args.rounds, args.only)
+        print_report(report)
+        print(f"\nResults written to {args.output}")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.current, encoding="utf-8") as f:
+        current = json.load(f)
+    rows = compare(baseline, current, args.threshold / 100)
+    print(f"{'scale':>8} {'bench':<16} {'baseline_us':>12} {'current_us':>12} {'change':>8}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regression"] else ""
+        print(f"{row['scale']:>8} {row['bench']:<16} {row['baseline_us']:>12} "
+              f"{row['current_us']:>12} {row['change']:>+8.1%}{flag}")
+    regressions = sum(row["regression"] for row in rows)
+    print(f"\n{regressions} regression(s) beyond {args.threshold}%")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,228 @@
+import os
+import sys
+import json
+import argparse
+from datetime import date
+from getpass import getpass
+from typing import Dict, List, Optional
+from authentication.service import AuthService
+from tasks.service import TaskService
+from tasks.query import TaskQuery, SORT_FIELDS
+from tasks.render import render_stats
+from tasks.stats import BUCKETS
+from tasks.transfer import DEFAULT_BATCH_SIZE
+from utils import metrics
+from utils.metrics import METRICS_ENV, METRICS_FILE_ENV
+
+EMAIL_ENV = "TODO_EMAIL"
+PASSWORD_ENV = "TODO_PASSWORD"
+TOKEN_ENV = "TODO_TOKEN"
+
+
+def _non_negative(value: str) -> int:
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError("must be zero or more")
+    return number
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="todo", description="One-shot To-Do App commands")
+    parser.add_argument("--email", default=os.environ.get(EMAIL_ENV),
+                        help=f"account email (default: ${EMAIL_ENV})")
+    parser.add_argument("--token", default=os.environ.get(TOKEN_ENV),
+                        help=f"session token from 'login', used instead of a password "
+                             f"(default: ${TOKEN_ENV})")
+    parser.add_argument("--json", action="store_true", help="print machine-readable JSON")
+    parser.add_argument("--metrics", action="store_true",
+                        help=f"print timing and I/O metrics to stderr at exit (or ${METRICS_ENV}=1)")
+    parser.add_argument("--metrics-file", metavar="PATH",
+                        help=f"write metrics in Prometheus text format at exit (or ${METRICS_FILE_ENV})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    register = commands.add_parser("register", help="create an account")
+    register.add_argument("--first-name", required=True)
+    register.add_argument("--last-name", required=True)
+    register.add_argument("--phone", required=True)
+
+    commands.add_parser("login", help="check the password once and print a session token")
+
+    add = commands.add_parser("add", help="create a task")
+    add.add_argument("title")
+    add.add_argument("--description", default="")
+    add.add_argument("--priority", default="medium")
+    add.add_argument("--status", default="to_do")
+    add.add_argument("--due", required=True, help="due date (YYYY-MM-DD)")
+
+    list_ = commands.add_parser("list", help="list tasks")
+    list_.add_argument("--priority", help="comma-separated priorities")
+    list_.add_argument("--status", help="comma-separated statuses")
+    list_.add_argument("--exclude-status", help="comma-separated statuses to leave out")
+    list_.add_argument("--due", help="exact due date")
+    list_.add_argument("--due-from")
+    list_.add_argument("--due-to")
+    list_.add_argument("--sort", default="created", choices=SORT_FIELDS)
+    list_.add_argument("--desc", action="store_true")
+    list_.add_argument("--limit", type=_non_negative)
+    list_.add_argument("--offset", type=_non_negative, default=0)
+    list_.add_argument("--include-archived", action="store_true",
+                       help="also list completed tasks moved to the archive")
+
+    show = commands.add_parser("show", help="show one task")
+    show.add_argument("id")
+
+    update = commands.add_parser("update", help="edit a task")
+    update.add_argument("id")
+    update.add_argument("--title")
+    update.add_argument("--description")
+    update.add_argument("--priority")
+    update.add_argument("--status")
+    update.add_argument("--due")
+
+    complete = commands.add_parser("complete", help="mark tasks as completed")
+    complete.add_argument("ids", nargs="+")
+
+    delete = commands.add_parser("delete", help="delete tasks")
+    delete.add_argument("ids", nargs="+")
+
+    search = commands.add_parser("search", help="search task titles and descriptions")
+    search.add_argument("term")
+    search.add_argument("--include-archived", action="store_true",
+                        help="also search completed tasks moved to the archive")
+
+    import_ = commands.add_parser(
+        "import", help="bulk-load tasks from a .csv, .json or .jsonl file",
+        description="Bulk-load tasks. The file is read in batches, but the default JSON storage "
+                    "holds every stored task in memory while it imports; with TODO_STREAMING=1 "
+                    "or the JSON Lines, sharded or SQLite storage, batches go straight to disk."
+    )
+    import_.add_argument("file")
+    import_.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE,
+                         help="tasks written per storage commit")
+
+    export = commands.add_parser("export", help="write tasks to a .csv, .json or .jsonl file")
+    export.add_argument("file")
+
+    stats = commands.add_parser("stats", help="summarise tasks by status, priority and due date")
+    stats.add_argument("--all", action="store_true", help="every user's tasks (admins only)")
+    stats.add_argument("--bucket", default="month", choices=BUCKETS)
+    stats.add_argument("--today", type=date.fromisoformat, help="count overdue as of this date")
+
+    archive = commands.add_parser("archive", help="move old completed tasks to compressed storage "
+                                                  "(admins only)")
+    archive.add_argument("--days", type=int, required=True,
+                         help="archive tasks completed at least this many days ago")
+    return parser
+
+
+def _password(confirm: bool = False) -> str:
+    password = os.environ.get(PASSWORD_ENV)
+    if password is None:
+        password = getpass("Password: ")
+        if confirm and getpass("Confirm password: ") != password:
+            raise ValueError("Passwords do not match")
+    return password
+
+
+def _authenticate(auth: AuthService, email: Optional[str], token: Optional[str]) -> Dict:
+    if token:
+        # A valid token skips bcrypt entirely
+        user = auth.session_user(token)
+        if not user:
+            raise ValueError("Invalid or expired session token")
+        if email and email.casefold() != user["email"].casefold():
+            raise ValueError("Session token belongs to another account")
+        return user
+    if not email:
+        raise ValueError(f"--email or ${EMAIL_ENV} is required")
+    user = auth.login(email, _password())
+    if not user:
+        raise ValueError("Invalid email or password")
+    return user
+
+
+def _print_tasks(tasks: List[Dict]) -> None:
+    if not tasks:
+        print("No tasks found.")
+        return
+    for task in tasks:
+        print(f"{task['id']}  {task['due_date']}  {task['priority']:<6}  "
+              f"{task['status']:<11}  {task['title']}")
+
+
+def run(args: argparse.Namespace) -> object:
+    auth = AuthService()
+    if args.command == "register":
+        if not args.email:
+            raise ValueError(f"--email or ${EMAIL_ENV} is required")
+        password = _password(confirm=True)
+        return auth.register(args.first_name, args.last_name, args.email,
+                             password, password, args.phone)
+
+    user = _authenticate(auth, args.email, args.token)
+    if args.command == "login":
+        token = args.token or auth.start_session(user)
+        return {"token": token, "expires_at": auth.sessions.expires_at(token), "email": user["email"]}
+    owner = user["email"]
+    service = TaskService()
+    if args.command == "add":
+        return service.create_task(owner, args.title, args.description,
+                                   args.priority, args.status, args.due)
+    if args.command == "list":
+        return service.list_tasks(owner, TaskQuery(
+            args.priority, args.status, args.exclude_status, args.due, args.due_from,
+            args.due_to, args.sort, args.desc, args.limit, args.offset
+        ), args.include_archived)
+    if args.command == "show":
+        return service.get_task(owner, args.id)
+    if args.command == "update":
+        fields = {"title": args.title, "description": args.description,
+                  "priority": args.priority, "status": args.status, "due_date": args.due}
+        return service.update_task(owner, args.id,
+                                   {k: v for k, v in fields.items() if v is not None})
+    if args.command == "complete":
+        return service.complete_tasks(owner, args.ids)
+    if args.command == "delete":
+        return service.delete_tasks(owner, args.ids)
+    if args.command == "search":
+        return service.search_tasks(owner, args.term, args.include_archived)
+    if args.command == "import":
+        return service.import_tasks(owner, args.file, args.batch_size).to_dict()
+    if args.command == "export":
+        return {"exported": service.export_tasks(owner, args.file), "file": args.file}
+    if args.command == "stats":
+        return service.get_stats(owner, args.all, args.bucket, args.today)
+    if args.command == "archive":
+        return {"archived": service.archive_tasks(owner, args.days)}
+    raise ValueError(f"Unknown command: {args.command}")
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.metrics or args.metrics_file:
+        metrics.enable(summary=args.metrics, prometheus_path=args.metrics_file)
+    try:
+        result = run(args)
+    except Exception as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    elif args.command == "stats":
+        print(render_stats(result, "All tasks" if args.all else "Your tasks"), end="")
+    elif isinstance(result, list) and all(isinstance(item, dict) for item in result):
+        _print_tasks(result)
+    elif isinstance(result, list):
+        print("\n".join(result) if result else "Nothing changed.")
+    else:
+        for key, value in result.items():
+            if isinstance(value, list):
+                print(f"{key}:" + "".join(f"\n  {item}" for item in value))
+            else:
+                print(f"{key}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
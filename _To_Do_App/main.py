@@ -1,14 +1,31 @@
-from authentication.auth import AuthManager
-from tasks.manager import TaskManager
-from datetime import datetime
-from typing import NoReturn
+from typing import TYPE_CHECKING, NoReturn, Optional
+
+if TYPE_CHECKING:
+    from authentication.auth import AuthManager
+    from tasks.manager import TaskManager
 
 class ToDoApp:
     def __init__(self):
-        self.auth_manager = AuthManager()
-        self.task_manager = TaskManager()
+        # Managers, and the storage, bcrypt and indexes behind them, are built on first use
+        # so the first menu shows up without waiting for any of it
+        self._auth_manager: Optional["AuthManager"] = None
+        self._task_manager: Optional["TaskManager"] = None
         self.current_user = None
 
+    @property
+    def auth_manager(self) -> "AuthManager":
+        if self._auth_manager is None:
+            from authentication.auth import AuthManager
+            self._auth_manager = AuthManager()
+        return self._auth_manager
+
+    @property
+    def task_manager(self) -> "TaskManager":
+        if self._task_manager is None:
+            from tasks.manager import TaskManager
+            self._task_manager = TaskManager()
+        return self._task_manager
+
     def run(self) -> NoReturn:
         print("\n=== To-Do App ===")
         while True:
@@ -54,6 +71,7 @@ class ToDoApp:
                 if updated_user:
                     self.current_user = updated_user
             elif choice == "3":
+                self.auth_manager.logout()
                 self.current_user = None
                 print("Logged out successfully!")
             else:
@@ -72,7 +90,8 @@ class ToDoApp:
             print("5. Delete Task")
             print("6. Search Tasks")
             print("7. Filter Tasks")
-            print("8. Back to Main Menu")
+            print("8. Task Statistics")
+            print("9. Back to Main Menu")
             
             try:
                 choice = input("Enter your choice: ").strip()
@@ -92,33 +111,18 @@ class ToDoApp:
                 elif choice == "7":
                     self.task_manager.filter_tasks(self.current_user['email'])
                 elif choice == "8":
+                    self.task_manager.show_stats(self.current_user['email'])
+                elif choice == "9":
                     break
                 else:
-                    print("Invalid choice! Please enter a number between 1-8")
+                    print("Invalid choice! Please enter a number between 1-9")
                     
             except Exception as e:
                 print(f"Task management error: {str(e)}")
 
     def _show_reminders(self) -> None:
         try:
-            tasks = self.task_manager.task_repo.get_user_tasks(self.current_user['email'])
-            today = datetime.now().date()
-            
-            overdue = []
-            upcoming = []
-            
-            for task in tasks:
-                try:
-                    due_date = datetime.strptime(task['due_date'], '%Y-%m-%d').date()
-                    days_left = (due_date - today).days
-                    
-                    if days_left < 0:
-                        overdue.append(task)
-                    elif 0 <= days_left <= 1:
-                        upcoming.append(task)
-                        
-                except ValueError:
-                    continue
+            overdue, upcoming = self.task_manager.service.get_reminders(self.current_user['email'])
             
             if overdue:
                 print("\n⚠️ OVERDUE TASKS:")
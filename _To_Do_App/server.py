@@ -0,0 +1,177 @@
+import sys
+import json
+import asyncio
+import argparse
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from authentication.service import AuthService
+from tasks.service import TaskService
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_REQUEST_BYTES = 1 << 20
+
+
+class TodoServer:
+    # Newline-delimited JSON over TCP: one request object per line, one response per line.
+    # "id" is echoed back, "action" picks the handler and "token" comes from login.
+    def __init__(self, auth: Optional[AuthService] = None, tasks: Optional[TaskService] = None):
+        self.auth = auth or AuthService()
+        self.tasks = tasks or TaskService()
+        # Repository work runs on one thread: the shared per-owner indexes are not thread-safe,
+        # and bcrypt (the expensive part) already has its own pool in the hasher
+        self.io_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="todo-io")
+        self.handlers: Dict[str, Callable] = {
+            "register": self.register,
+            "login": self.login,
+            "logout": self.logout,
+            "create_task": self.create_task,
+            "get_task": self.get_task,
+            "list_tasks": self.list_tasks,
+            "search_tasks": self.search_tasks,
+            "update_task": self.update_task,
+            "complete_tasks": self.complete_tasks,
+            "delete_tasks": self.delete_tasks,
+            "reminders": self.reminders,
+            "stats": self.stats,
+        }
+
+    async def _io(self, func: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.io_executor, functools.partial(func, *args, **kwargs))
+
+    def _owner(self, request: Dict) -> str:
+        # Token checks are an in-memory LRU hit, so they stay on the event loop
+        email = self.auth.session_email(request.get("token"))
+        if email is None:
+            raise PermissionError("Not logged in")
+        return email
+
+    async def register(self, request: Dict) -> Dict:
+        password = request.get("password", "")
+        return await self.auth.register_async(
+            request.get("first_name", ""), request.get("last_name", ""),
+            request.get("email", ""), password, request.get("confirm_password", password),
+            request.get("phone_number", ""), executor=self.io_executor
+        )
+
+    async def login(self, request: Dict) -> Dict:
+        user = await self.auth.login_async(request.get("email", ""), request.get("password", ""),
+                                           executor=self.io_executor)
+        if not user:
+            raise PermissionError("Invalid email or password")
+        token = self.auth.start_session(user)
+        return {"token": token, "expires_at": self.auth.sessions.expires_at(token), "user": user}
+
+    async def logout(self, request: Dict) -> bool:
+        return self.auth.logout(request.get("token"))
+
+    async def create_task(self, request: Dict) -> Dict:
+        return await self._io(self.tasks.create_task, self._owner(request),
+                              request.get("title", ""), request.get("description", ""),
+                              request.get("priority", "medium"), request.get("status", "to_do"),
+                              request.get("due_date", ""))
+
+    async def get_task(self, request: Dict) -> Dict:
+        return await self._io(self.tasks.get_task, self._owner(request),
+                              request.get("task_id", ""))
+
+    async def list_tasks(self, request: Dict) -> list:
+        return await self._io(self.tasks.list_tasks, self._owner(request), request.get("filters"),
+                              bool(request.get("include_archived")))
+
+    async def search_tasks(self, request: Dict) -> list:
+        return await self._io(self.tasks.search_tasks, self._owner(request), request.get("term", ""),
+                              bool(request.get("include_archived")))
+
+    async def update_task(self, request: Dict) -> Dict:
+        return await self._io(self.tasks.update_task, self._owner(request),
+                              request.get("task_id", ""), request.get("data") or {})
+
+    async def complete_tasks(self, request: Dict) -> list:
+        return await self._io(self.tasks.complete_tasks, self._owner(request),
+                              request.get("task_ids", []))
+
+    async def delete_tasks(self, request: Dict) -> list:
+        return await self._io(self.tasks.delete_tasks, self._owner(request),
+                              request.get("task_ids", []))
+
+    async def reminders(self, request: Dict) -> Dict:
+        overdue, upcoming = await self._io(self.tasks.get_reminders, self._owner(request))
+        return {"overdue": overdue, "upcoming": upcoming}
+
+    async def stats(self, request: Dict) -> Dict:
+        return await self._io(self.tasks.get_stats, self._owner(request),
+                              bool(request.get("all")), request.get("bucket", "month"))
+
+    async def dispatch(self, line: bytes) -> Dict:
+        request_id = None
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("Request must be a JSON object")
+            request_id = request.get("id")
+            handler = self.handlers.get(request.get("action"))
+            if handler is None:
+                raise ValueError(f"Unknown action: {request.get('action')}")
+            return {"id": request_id, "ok": True, "result": await handler(request)}
+        except Exception as e:
+            return {"id": request_id, "ok": False, "error": str(e)}
+
+    async def handle_client(self, reader: asyncio.StreamReader,
+                            writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    response = {"id": None, "ok": False, "error": "Request too large"}
+                    writer.write(json.dumps(response).encode() + b"\n")
+                    break
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+                response = await self.dispatch(line)
+                writer.write(json.dumps(response, ensure_ascii=False).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            # Dropped clients and server shutdown just end the conversation
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle_client, host, port, limit=MAX_REQUEST_BYTES)
+
+    def close(self) -> None:
+        self.io_executor.shutdown(wait=True)
+
+
+async def serve(host: str, port: int) -> None:
+    app = TodoServer()
+    server = await app.start(host, port)
+    address = server.sockets[0].getsockname()
+    print(f"Serving To-Do API on {address[0]}:{address[1]}", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        app.close()
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve the To-Do App as JSON over TCP")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
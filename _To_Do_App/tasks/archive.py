@@ -0,0 +1,77 @@
+import os
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Union
+from utils.helpers import format_timestamp, generate_id, now_timestamp
+from utils.storage import JSONStorage
+from utils.streaming import GZIP_SUFFIX, JSONL_SUFFIX, iter_records, write_records
+
+ARCHIVE_DAYS_ENV = "TODO_ARCHIVE_DAYS"
+ARCHIVE_INTERVAL = 24 * 60 * 60
+MANIFEST_NAME = "manifest.json"
+LAST_RUN_NAME = "last_run"
+
+
+def archive_days() -> Optional[int]:
+    # Automatic archiving is off unless an age is configured
+    try:
+        days = int(os.environ.get(ARCHIVE_DAYS_ENV, ""))
+    except ValueError:
+        return None
+    return days if days >= 0 else None
+
+
+class TaskArchive:
+    # Cold storage for old completed tasks. Every run writes one compressed segment that is never
+    # rewritten, and the manifest notes whose tasks each segment holds so reads open only those
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        self.manifest = JSONStorage(str(self.directory / MANIFEST_NAME))
+        self._last_run = self.directory / LAST_RUN_NAME
+
+    def version(self) -> tuple:
+        return self.manifest.signature()
+
+    def segments(self, owner: Optional[str] = None) -> List[Dict]:
+        if not self.manifest.file_path.exists():
+            return []
+        return [segment for segment in self.manifest.load()
+                if owner is None or owner in segment["owners"]]
+
+    def append(self, tasks: List[Dict]) -> Optional[str]:
+        if not tasks:
+            return None
+        self.directory.mkdir(parents=True, exist_ok=True)
+        name = f"{generate_id()}{JSONL_SUFFIX}{GZIP_SUFFIX}"
+        # The segment is complete on disk before the manifest points at it
+        write_records(self.directory / name, tasks)
+        self.manifest.insert({
+            "name": name,
+            "tasks": len(tasks),
+            "owners": dict(Counter(task.get("owner", "") for task in tasks)),
+            "created_at": format_timestamp(now_timestamp()),
+        })
+        return name
+
+    def iter_tasks(self, owner: Optional[str] = None) -> Iterator[Dict]:
+        seen = set()
+        for segment in self.segments(owner):
+            for task in iter_records(self.directory / segment["name"]):
+                if owner is not None and task.get("owner") != owner:
+                    continue
+                # A run interrupted before the hot file was rewritten archives those tasks again
+                if task.get("id") in seen:
+                    continue
+                seen.add(task.get("id"))
+                yield task
+
+    def due(self, interval: int = ARCHIVE_INTERVAL) -> bool:
+        try:
+            return time.time() - self._last_run.stat().st_mtime >= interval
+        except FileNotFoundError:
+            return True
+
+    def mark_run(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._last_run.touch()
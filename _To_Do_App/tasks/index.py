@@ -0,0 +1,211 @@
+import re
+from bisect import bisect_left, bisect_right, insort
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    from .models import Task
+    from .stats import TaskStats
+
+TOKEN_PATTERN = re.compile(r"\w+")
+TITLE_WEIGHT = 3
+DESCRIPTION_WEIGHT = 1
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class SearchIndex:
+    def __init__(self, tasks: Iterable["Task"] = ()):
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._documents: Dict[str, Dict[str, int]] = {}
+        self._vocabulary: List[str] = []
+        for task in tasks:
+            self.add(task)
+
+    def add(self, task: "Task") -> None:
+        weights: Dict[str, int] = {}
+        for token in tokenize(task.title or ""):
+            weights[token] = weights.get(token, 0) + TITLE_WEIGHT
+        for token in tokenize(task.description or ""):
+            weights[token] = weights.get(token, 0) + DESCRIPTION_WEIGHT
+
+        self._documents[task.id] = weights
+        for token, weight in weights.items():
+            if token not in self._postings:
+                self._postings[token] = {}
+                insort(self._vocabulary, token)
+            self._postings[token][task.id] = weight
+
+    def remove(self, task: "Task") -> None:
+        for token in self._documents.pop(task.id, {}):
+            postings = self._postings[token]
+            del postings[task.id]
+            if not postings:
+                del self._postings[token]
+                del self._vocabulary[bisect_left(self._vocabulary, token)]
+
+    def _expand(self, term: str) -> List[str]:
+        start = bisect_left(self._vocabulary, term)
+        end = start
+        while end < len(self._vocabulary) and self._vocabulary[end].startswith(term):
+            end += 1
+        return self._vocabulary[start:end]
+
+    def search(self, query: str) -> List[str]:
+        scores: Dict[str, float] = {}
+        for position, term in enumerate(dict.fromkeys(tokenize(query))):
+            term_scores: Dict[str, float] = {}
+            for token in self._expand(term):
+                # Whole-word matches outrank prefix matches
+                boost = 2 if token == term else 1
+                for task_id, weight in self._postings[token].items():
+                    term_scores[task_id] = term_scores.get(task_id, 0) + weight * boost
+            if position == 0:
+                scores = term_scores
+            else:
+                scores = {task_id: score + term_scores[task_id]
+                          for task_id, score in scores.items() if task_id in term_scores}
+            if not scores:
+                return []
+        # Task IDs are time-ordered, so ties fall back to creation order
+        return sorted(scores, key=lambda task_id: (-scores[task_id], task_id))
+
+
+class FilterIndex:
+    def __init__(self, tasks: Iterable["Task"] = ()):
+        self.by_priority: Dict[str, Set[str]] = {}
+        self.by_status: Dict[str, Set[str]] = {}
+        self.by_due: List[Tuple[str, str]] = []
+        for task in tasks:
+            self.by_priority.setdefault(task.priority, set()).add(task.id)
+            self.by_status.setdefault(task.status, set()).add(task.id)
+            self.by_due.append((task.due_date, task.id))
+        self.by_due.sort()
+
+    def add(self, task: "Task") -> None:
+        self.by_priority.setdefault(task.priority, set()).add(task.id)
+        self.by_status.setdefault(task.status, set()).add(task.id)
+        insort(self.by_due, (task.due_date, task.id))
+
+    def remove(self, task: "Task") -> None:
+        for index, key in ((self.by_priority, task.priority), (self.by_status, task.status)):
+            ids = index[key]
+            ids.discard(task.id)
+            if not ids:
+                del index[key]
+        del self.by_due[bisect_left(self.by_due, (task.due_date, task.id))]
+
+    def with_priority(self, priorities: Iterable[str]) -> Set[str]:
+        return set().union(*(self.by_priority.get(p, ()) for p in priorities))
+
+    def with_status(self, statuses: Iterable[str]) -> Set[str]:
+        return set().union(*(self.by_status.get(s, ()) for s in statuses))
+
+    def _due_bounds(self, due_from: Optional[str], due_to: Optional[str]) -> Tuple[int, int]:
+        start = bisect_left(self.by_due, (due_from,)) if due_from else 0
+        # "\uffff" sorts after any task ID, so the bound includes due_to itself
+        end = bisect_right(self.by_due, (due_to, "\uffff")) if due_to else len(self.by_due)
+        return start, end
+
+    def due_between(self, due_from: Optional[str], due_to: Optional[str]) -> Set[str]:
+        start, end = self._due_bounds(due_from, due_to)
+        return {task_id for _, task_id in self.by_due[start:end]}
+
+    def iter_by_due(self, due_from: Optional[str] = None, due_to: Optional[str] = None,
+                    descending: bool = False) -> Iterator[str]:
+        start, end = self._due_bounds(due_from, due_to)
+        positions = range(end - 1, start - 1, -1) if descending else range(start, end)
+        return (self.by_due[i][1] for i in positions)
+
+
+class ReminderIndex:
+    def __init__(self, tasks: Iterable["Task"] = ()):
+        self.by_due: List[Tuple[int, str]] = []
+        for task in tasks:
+            key = self._key(task)
+            if key is not None:
+                self.by_due.append(key)
+        self.by_due.sort()
+
+    @staticmethod
+    def _key(task: "Task") -> Optional[Tuple[int, str]]:
+        if task.status == "completed":
+            return None
+        ordinal = task.due_ordinal
+        return None if ordinal is None else (ordinal, task.id)
+
+    def add(self, task: "Task") -> None:
+        key = self._key(task)
+        if key is not None:
+            insort(self.by_due, key)
+
+    def remove(self, task: "Task") -> None:
+        key = self._key(task)
+        if key is not None:
+            del self.by_due[bisect_left(self.by_due, key)]
+
+    def due_before(self, ordinal: int) -> List[str]:
+        return [task_id for _, task_id in self.by_due[:bisect_left(self.by_due, (ordinal,))]]
+
+    def due_between(self, first: int, last: int) -> List[str]:
+        start = bisect_left(self.by_due, (first,))
+        end = bisect_left(self.by_due, (last + 1,))
+        return [task_id for _, task_id in self.by_due[start:end]]
+
+
+def _stats(tasks: Iterable["Task"]) -> "TaskStats":
+    # Imported here: stats builds on the task models, which import this module
+    from .stats import TaskStats
+    return TaskStats(tasks)
+
+
+class TaskIndex:
+    factories = {"text": SearchIndex, "filters": FilterIndex, "reminders": ReminderIndex,
+                 "stats": _stats}
+
+    def __init__(self, tasks: List["Task"], signature: Any = None):
+        self.signature = signature
+        self.tasks: Dict[str, "Task"] = {task.id: task for task in tasks}
+        self._built: Dict[str, Any] = {}
+
+    def _get(self, name: str) -> Any:
+        index = self._built.get(name)
+        if index is None:
+            index = self._built[name] = self.factories[name](self.tasks.values())
+        return index
+
+    @property
+    def text(self) -> SearchIndex:
+        return self._get("text")
+
+    @property
+    def filters(self) -> FilterIndex:
+        return self._get("filters")
+
+    @property
+    def reminders(self) -> ReminderIndex:
+        return self._get("reminders")
+
+    @property
+    def stats(self) -> "TaskStats":
+        return self._get("stats")
+
+    def add(self, task: "Task") -> None:
+        self.tasks[task.id] = task
+        for index in self._built.values():
+            index.add(task)
+
+    def remove(self, task_id: str) -> None:
+        task = self.tasks.pop(task_id, None)
+        if task is not None:
+            for index in self._built.values():
+                index.remove(task)
+
+    def replace(self, task: "Task") -> None:
+        old = self.tasks.get(task.id)
+        for index in self._built.values():
+            if old is not None:
+                index.remove(old)
+            index.add(task)
+        self.tasks[task.id] = task
@@ -1,12 +1,19 @@
-from typing import Optional, Dict, List
+import sys
+from typing import Optional, Dict, Iterable, List, Sequence
 from datetime import datetime
-from .models import Task, TaskRepository
-from authentication.validation import Validator
+from .service import TaskService, is_admin
+from .render import TaskPager, VERBOSE_FIELDS, default_page_size, render_stats
+from authentication.validation import Validator, PRIORITIES, STATUSES
+
+FILTERED_FIELDS = ("title", "priority", "status", "due_date")
 
 class TaskManager:
-    def __init__(self):
+    def __init__(self, page_size: Optional[int] = None, layout: str = "verbose"):
         self.validator = Validator()
-        self.task_repo = TaskRepository()
+        self.service = TaskService()
+        self.task_repo = self.service.task_repo
+        self.page_size = page_size or default_page_size()
+        self.layout = layout
 
     def create_task(self, user_email: str) -> Optional[Dict]:
         print("\n=== Create New Task ===")
@@ -20,44 +27,40 @@ class TaskManager:
             status = self._get_valid_status()
             due_date = self._get_valid_date()
             
-            new_task = Task(title, description, priority, status, due_date, user_email)
-            self.task_repo.add_task(new_task)
+            new_task = self.service.create_task(
+                user_email, title, description, priority, status, due_date
+            )
             
             print("Task created successfully!")
-            return new_task.to_dict()
+            return new_task
             
         except Exception as e:
             print(f"\nTask creation failed: {str(e)}")
             return None
 
-    def view_tasks(self, user_email: str) -> None:
+    def view_tasks(self, user_email: str, tasks: Optional[List[Dict]] = None) -> None:
         try:
-            tasks = self.task_repo.get_user_tasks(user_email)
+            if tasks is None:
+                tasks = self.service.list_tasks(user_email)
             if not tasks:
                 print("\nNo tasks found.")
                 return
 
             print("\n=== Your Tasks ===")
-            for idx, task in enumerate(tasks, 1):
-                print(f"\nTask #{idx}")
-                print(f"Title: {task['title']}")
-                print(f"Description: {task['description']}")
-                print(f"Priority: {task['priority'].capitalize()}")
-                print(f"Status: {task['status'].replace('_', ' ').capitalize()}")
-                print(f"Due Date: {task['due_date']}")
-                
+            self._page_through(tasks)
+
         except Exception as e:
             print(f"\nFailed to view tasks: {str(e)}")
 
     def update_task(self, user_email: str) -> Optional[Dict]:
         print("\n=== Update Task ===")
         try:
-            tasks = self.task_repo.get_user_tasks(user_email)
+            tasks = self.service.list_tasks(user_email)
             if not tasks:
                 print("No tasks found to update.")
                 return None
                 
-            self.view_tasks(user_email)
+            self.view_tasks(user_email, tasks)
             task_num = self._get_task_number(len(tasks))
             if task_num is None:
                 return None
@@ -83,7 +86,7 @@ class TaskManager:
                 "due_date": new_date
             }
             
-            self.task_repo.update_task(task['title'], updated_task)
+            self.service.update_task(user_email, task['id'], updated_task)
             print("Task updated successfully!")
             return updated_task
             
@@ -94,12 +97,12 @@ class TaskManager:
     def complete_task(self, user_email: str) -> bool:
         print("\n=== Complete Task ===")
         try:
-            tasks = self.task_repo.get_user_tasks(user_email)
+            tasks = self.service.list_tasks(user_email)
             if not tasks:
                 print("No tasks found to complete.")
                 return False
                 
-            self.view_tasks(user_email)
+            self.view_tasks(user_email, tasks)
             task_num = self._get_task_number(len(tasks))
             if task_num is None:
                 return False
@@ -111,10 +114,7 @@ class TaskManager:
                 
             confirm = input(f"Mark '{task['title']}' as completed? (y/n): ").lower()
             if confirm == 'y':
-                self.task_repo.update_task(
-                    task['title'],
-                    {"status": "completed"}
-                )
+                self.service.complete_tasks(user_email, [task['id']])
                 print("Task marked as completed!")
                 return True
             return False
@@ -126,12 +126,12 @@ class TaskManager:
     def delete_task(self, user_email: str) -> bool:
         print("\n=== Delete Task ===")
         try:
-            tasks = self.task_repo.get_user_tasks(user_email)
+            tasks = self.service.list_tasks(user_email)
             if not tasks:
                 print("No tasks found to delete.")
                 return False
                 
-            self.view_tasks(user_email)
+            self.view_tasks(user_email, tasks)
             task_num = self._get_task_number(len(tasks))
             if task_num is None:
                 return False
@@ -140,7 +140,7 @@ class TaskManager:
             confirm = input(f"Are you sure you want to delete '{task['title']}'? (y/n): ").lower()
             
             if confirm == 'y':
-                self.task_repo.delete_task(task['title'])
+                self.service.delete_tasks(user_email, [task['id']])
                 print("Task deleted successfully!")
                 return True
             return False
@@ -152,17 +152,17 @@ class TaskManager:
     def search_tasks(self, user_email: str) -> None:
         print("\n=== Search Tasks ===")
         try:
-            search_term = input("Enter search term (task title): ").strip().lower()
+            search_term = input("Enter search term (title or description): ").strip().lower()
             if not search_term:
                 print("Please enter a search term.")
                 return
                 
-            tasks = self.task_repo.get_user_tasks(user_email)
-            results = [task for task in tasks if search_term in task['title'].lower()]
+            results = self.service.search_tasks(user_email, search_term,
+                                                self._include_archived(user_email))
             
             if results:
                 print(f"\nFound {len(results)} matching tasks:")
-                self.view_tasks(user_email)  # Reuse view_tasks for consistent output
+                self.view_tasks(user_email, results)  # Reuse view_tasks for consistent output
             else:
                 print("No tasks found matching your search.")
                 
@@ -176,31 +176,76 @@ class TaskManager:
             print("1. Priority")
             print("2. Status")
             print("3. Due Date")
+            print("4. Combined Criteria")
             
-            choice = input("Enter your choice (1-3): ").strip()
-            tasks = self.task_repo.get_user_tasks(user_email)
+            choice = input("Enter your choice (1-4): ").strip()
+            archived = choice in ("1", "2", "3", "4") and self._include_archived(user_email)
             
             if choice == "1":
                 priority = input("Enter priority (High/Medium/Low): ").strip().lower()
-                filtered = [t for t in tasks if t['priority'] == priority]
+                if not priority:
+                    print("Please enter a priority.")
+                    return
+                filtered = self.service.list_tasks(user_email, {"priority": priority}, archived)
                 self._display_filtered(filtered, f"Priority: {priority}")
                 
             elif choice == "2":
                 status = input("Enter status (To_Do/In_Progress/Completed): ").strip().lower()
-                filtered = [t for t in tasks if t['status'] == status]
+                if not status:
+                    print("Please enter a status.")
+                    return
+                filtered = self.service.list_tasks(user_email, {"status": status}, archived)
                 self._display_filtered(filtered, f"Status: {status}")
                 
             elif choice == "3":
                 date = input("Enter due date (YYYY-MM-DD): ").strip()
-                filtered = [t for t in tasks if t['due_date'] == date]
+                if not date:
+                    print("Please enter a due date.")
+                    return
+                filtered = self.service.list_tasks(user_email, {"due_date": date}, archived)
                 self._display_filtered(filtered, f"Due Date: {date}")
                 
+            elif choice == "4":
+                print("Leave a field blank to skip it. Separate multiple values with commas.")
+                filters = {
+                    "priority": input("Priorities (High/Medium/Low): ").strip() or None,
+                    "status": input("Statuses (To_Do/In_Progress/Completed): ").strip() or None,
+                    "exclude_status": input("Exclude statuses: ").strip() or None,
+                    "due_from": input("Due from (YYYY-MM-DD): ").strip() or None,
+                    "due_to": input("Due to (YYYY-MM-DD): ").strip() or None,
+                    "sort": input("Sort by (created/due_date/priority/status/title) [created]: ").strip().lower() or "created"
+                }
+                filtered = self.service.list_tasks(user_email, filters, archived)
+                description = ", ".join(f"{k}={v}" for k, v in filters.items() if v and k != "sort")
+                self._display_filtered(filtered, description or "all tasks")
+                
             else:
                 print("Invalid choice!")
                 
         except Exception as e:
             print(f"\nFilter failed: {str(e)}")
 
+    def _include_archived(self, user_email: str) -> bool:
+        # Only asked once some of the user's tasks have been archived
+        if not self.service.has_archived(user_email):
+            return False
+        return input("Include archived tasks? (y/n): ").strip().lower() == 'y'
+
+    def show_stats(self, user_email: str) -> None:
+        print("\n=== Task Statistics ===")
+        try:
+            all_users = False
+            if is_admin(user_email):
+                all_users = input("Include every user's tasks? (y/n): ").strip().lower() == 'y'
+            bucket = input("Group by (day/week/month) [month]: ").strip().lower() or "month"
+            summary = self.service.get_stats(user_email, all_users, bucket)
+            if not summary["total"]:
+                print("No tasks found.")
+                return
+            sys.stdout.write(render_stats(summary, "All tasks" if all_users else "Your tasks"))
+        except Exception as e:
+            print(f"\nFailed to compute statistics: {str(e)}")
+
     def _get_valid_input(self, prompt: str, required: bool = False, default: str = "") -> str:
         while True:
             try:
@@ -219,7 +264,7 @@ class TaskManager:
                     f"Priority (High/Medium/Low) [{default}]: "
                 ).strip().lower() or default
                 
-                if priority in ["high", "medium", "low"]:
+                if priority in PRIORITIES:
                     return priority
                 print("Invalid priority! Please choose from High/Medium/Low")
             except Exception as e:
@@ -232,7 +277,7 @@ class TaskManager:
                     f"Status (To_Do/In_Progress/Completed) [{default}]: "
                 ).strip().lower() or default
                 
-                if status in ["to_do", "in_progress", "completed"]:
+                if status in STATUSES:
                     return status
                 print("Invalid status! Please choose from To_Do/In_Progress/Completed")
             except Exception as e:
@@ -272,11 +317,25 @@ class TaskManager:
     def _display_filtered(self, tasks: List[Dict], filter_type: str) -> None:
         if tasks:
             print(f"\nTasks filtered by {filter_type}:")
-            for idx, task in enumerate(tasks, 1):
-                print(f"\nTask #{idx}")
-                print(f"Title: {task['title']}")
-                print(f"Priority: {task['priority'].capitalize()}")
-                print(f"Status: {task['status'].replace('_', ' ').capitalize()}")
-                print(f"Due Date: {task['due_date']}")
+            self._page_through(tasks, FILTERED_FIELDS)
         else:
-            print(f"No tasks found for {filter_type}")
\ No newline at end of file
+            print(f"No tasks found for {filter_type}")
+
+    def _page_through(self, tasks: Iterable[Dict], fields: Sequence[str] = VERBOSE_FIELDS) -> None:
+        pager = TaskPager(tasks, self.page_size, self.layout, fields)
+        while True:
+            pager.show()
+            if not (pager.has_next or pager.has_previous):
+                return
+            choice = input("[n]ext, [p]revious, [l]ayout or Enter to finish: ").strip().lower()
+            if choice == "n":
+                if not pager.next():
+                    print("Already on the last page.")
+            elif choice == "p":
+                if not pager.previous():
+                    print("Already on the first page.")
+            elif choice == "l":
+                # The chosen layout sticks for the rest of the session
+                self.layout = pager.toggle_layout()
+            else:
+                return
\ No newline at end of file
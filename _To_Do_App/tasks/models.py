@@ -1,51 +1,405 @@
-import json
+from datetime import date, datetime
+from enum import IntEnum
 from pathlib import Path
-from datetime import datetime
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, Union
+from authentication.models import BaseModel, BaseRepository
+from utils.storage import ShardedStorage, SQLiteStorage, Storage
+from utils import metrics
+from utils.helpers import (generate_id, now_timestamp, encode_timestamp, format_timestamp,
+                           encode_date, format_date)
+from .archive import ARCHIVE_INTERVAL, TaskArchive, archive_days
+from .index import TaskIndex
+from .query import TaskQuery
+
+if TYPE_CHECKING:
+    from .stats import TaskStats
+
+class Priority(IntEnum):
+    HIGH = 0
+    MEDIUM = 1
+    LOW = 2
+
+    @property
+    def label(self) -> str:
+        return self.name.lower()
+
+class Status(IntEnum):
+    TO_DO = 0
+    IN_PROGRESS = 1
+    COMPLETED = 2
+
+    @property
+    def label(self) -> str:
+        return self.name.lower()
+
+PRIORITY_CODES = {priority.label: priority for priority in Priority}
+STATUS_CODES = {status.label: status for status in Status}
+SECONDS_PER_DAY = 24 * 60 * 60
+IDS_MARKER_SUFFIX = ".ids"
+
+class Task(BaseModel):
+    __slots__ = ("id", "title", "description", "_priority", "_status", "_due", "owner", "_created")
+    fields = ("id", "title", "description", "priority", "status", "due_date", "owner", "created_at")
 
-class Task:
     def __init__(self, title: str, description: str, priority: str, 
                  status: str, due_date: str, owner: str):
+        self.id = generate_id()
         self.title = title
         self.description = description
         self.priority = priority.lower()
         self.status = status.lower()
         self.due_date = due_date
         self.owner = owner
-        self.created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-
-    def to_dict(self) -> Dict:
-        return {
-            "title": self.title,
-            "description": self.description,
-            "priority": self.priority,
-            "status": self.status,
-            "due_date": self.due_date,
-            "owner": self.owner,
-            "created_at": self.created_at
-        }
-
-class TaskRepository:
+        self._created = now_timestamp()
+        self._extra = None
+
+    @property
+    def priority(self) -> str:
+        return self._priority.label if isinstance(self._priority, Priority) else self._priority
+
+    @priority.setter
+    def priority(self, value: str) -> None:
+        self._priority = PRIORITY_CODES.get(value, value)
+
+    @property
+    def status(self) -> str:
+        return self._status.label if isinstance(self._status, Status) else self._status
+
+    @status.setter
+    def status(self, value: str) -> None:
+        self._status = STATUS_CODES.get(value, value)
+
+    @property
+    def due_date(self) -> str:
+        return format_date(self._due)
+
+    @due_date.setter
+    def due_date(self, value: str) -> None:
+        self._due = encode_date(value)
+
+    @property
+    def due_ordinal(self) -> Optional[int]:
+        if isinstance(self._due, int):
+            return self._due
+        try:
+            return datetime.strptime(self._due, '%Y-%m-%d').toordinal()
+        except (TypeError, ValueError):
+            return None
+
+    @property
+    def created_at(self) -> str:
+        return format_timestamp(self._created)
+
+    @created_at.setter
+    def created_at(self, value: str) -> None:
+        self._created = encode_timestamp(value)
+
+    @property
+    def created(self) -> Union[int, str]:
+        return self._created
+
+class TaskRepository(BaseRepository):
+    indexes = ("id", "owner")
+    shard_field = "owner"
+
     def __init__(self, file_path: str = "data/tasks.json"):
-        self.file_path = Path(file_path)
-        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        super().__init__(file_path)
+        self._owner_indexes: Dict[str, TaskIndex] = {}
+        # Stats over every owner, kept per storage partition with the signature they match
+        self._stats: Dict[Storage, Tuple[Any, "TaskStats"]] = {}
+        self.archive = TaskArchive(self.file_path.with_suffix(".archive"))
+        # Archived tasks per owner, decompressed once per archive version
+        self._archived: Dict[str, Tuple[Any, List[Task]]] = {}
+        self._archive_indexes: Dict[str, TaskIndex] = {}
+        self._backfill_ids()
+        self._auto_archive()
 
-    def load_tasks(self) -> List[Dict]:
+    def _backfill_ids(self) -> None:
+        # A one-time migration: tasks written since the IDs landed always carry one
+        if isinstance(self.storage, SQLiteStorage):
+            # Migrations can fill the database at any time, and asking it costs one query
+            if self.storage.missing("id"):
+                with self.storage.lock():
+                    self._assign_ids()
+            return
+        # The marker names the store it vouches for, so a converted or newly sharded copy of
+        # the same data is scanned again
+        marker = self.file_path.with_name(self.file_path.name + IDS_MARKER_SUFFIX)
+        scanned = str(getattr(self.storage, "directory", None) or self.storage.file_path)
+        if self._marked(marker, scanned):
+            return
+        if isinstance(self.storage, ShardedStorage) and not self.storage.created:
+            # Records only reach an existing sharded layout through add_task
+            marker.write_text(scanned, encoding='utf-8')
+            return
+        with self.storage.lock():
+            if self._marked(marker, scanned):
+                return
+            self._assign_ids()
+            marker.write_text(scanned, encoding='utf-8')
+
+    @staticmethod
+    def _marked(marker: Path, scanned: str) -> bool:
         try:
-            with open(self.file_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return []
+            return marker.read_text(encoding='utf-8') == scanned
+        except FileNotFoundError:
+            return False
+
+    def _assign_ids(self) -> None:
+        if self.storage.missing("id"):
+            self.save([task if "id" in task else {"id": generate_id(), **task}
+                       for task in self.load()])
+
+    def _signature(self, user_email: str) -> Tuple:
+        return self.storage.signature({"owner": user_email})
+
+    def _owner_index(self, user_email: str) -> TaskIndex:
+        signature = self._signature(user_email)
+        index = self._owner_indexes.get(user_email)
+        if index is None or index.signature != signature:
+            tasks = self.storage.iter_find({"owner": user_email})
+            index = TaskIndex([Task.from_dict(task) for task in tasks], signature)
+            self._owner_indexes[user_email] = index
+        return index
+
+    def _archived_tasks(self, user_email: str) -> List[Task]:
+        version = self.archive.version()
+        cached = self._archived.get(user_email)
+        if cached is None or cached[0] != version:
+            cached = self._archived[user_email] = (
+                version, [Task.from_dict(task) for task in self.archive.iter_tasks(user_email)])
+        return cached[1]
+
+    def _archive_index(self, user_email: str) -> TaskIndex:
+        hot = self._owner_index(user_email)
+        signature = (hot.signature, self.archive.version())
+        index = self._archive_indexes.get(user_email)
+        if index is None or index.signature != signature:
+            # Hot copies win, so a task is never listed twice if a run stopped halfway
+            tasks = [task for task in self._archived_tasks(user_email) if task.id not in hot.tasks]
+            index = TaskIndex(tasks + list(hot.tasks.values()), signature)
+            self._archive_indexes[user_email] = index
+        return index
+
+    def _index(self, user_email: str, include_archived: bool = False) -> TaskIndex:
+        if include_archived:
+            return self._archive_index(user_email)
+        return self._owner_index(user_email)
+
+    def _stored_task(self, user_email: str, task_id: str) -> Optional[Dict]:
+        return next(iter(self.storage.find({"id": task_id, "owner": user_email})), None)
+
+    def _current_index(self, user_email: str) -> Optional[TaskIndex]:
+        index = self._owner_indexes.get(user_email)
+        if index is not None and index.signature != self._signature(user_email):
+            del self._owner_indexes[user_email]
+            return None
+        return index
+
+    def _sync_index(self, user_email: str, index: Optional[TaskIndex],
+                    apply: Callable[[TaskIndex], None]) -> None:
+        if index is not None:
+            apply(index)
+            index.signature = self._signature(user_email)
+
+    def _partition_stats(self, partition: Storage) -> "TaskStats":
+        from .stats import TaskStats
+
+        signature = partition.signature()
+        cached = self._stats.get(partition)
+        if cached is None or cached[0] != signature:
+            cached = self._stats[partition] = (signature,
+                                               TaskStats.from_records(partition.iter_find({})))
+        return cached[1]
 
-    def save_tasks(self, tasks: List[Dict]) -> None:
-        with open(self.file_path, "w", encoding="utf-8") as f:
-            json.dump(tasks, f, indent=4)
+    def _current_stats(self, user_email: str) -> Optional[Tuple[Storage, "TaskStats"]]:
+        partition = self.storage.partitions({"owner": user_email})[0]
+        cached = self._stats.get(partition)
+        if cached is None:
+            return None
+        if cached[0] != partition.signature():
+            del self._stats[partition]
+            return None
+        return partition, cached[1]
 
-    def get_user_tasks(self, user_email: str) -> List[Dict]:
-        tasks = self.load_tasks()
-        return [task for task in tasks if task["owner"] == user_email]
+    def _sync_stats(self, current: Optional[Tuple[Storage, "TaskStats"]],
+                    apply: Callable[["TaskStats"], None]) -> None:
+        if current is not None:
+            partition, stats = current
+            apply(stats)
+            self._stats[partition] = (partition.signature(), stats)
 
-    def find_task_by_title(self, user_email: str, title: str) -> Optional[Dict]:
-        tasks = self.load_tasks()
-        return next((task for task in tasks 
-                    if task["owner"] == user_email and task["title"] == title), None)
\ No newline at end of file
+    @staticmethod
+    def _archivable(task: Dict, cutoff: int) -> bool:
+        # Archived tasks leave the hot store by id, so only those carrying one qualify
+        if task.get("status") != "completed" or "id" not in task:
+            return False
+        # Tasks completed before completion times were recorded age from their creation
+        finished = encode_timestamp(task.get("completed_at") or task.get("created_at"))
+        return isinstance(finished, int) and finished < cutoff
+
+    def _auto_archive(self) -> None:
+        days = archive_days()
+        if days is not None and self.archive.due(ARCHIVE_INTERVAL):
+            self.archive_completed(days)
+
+    @metrics.timed()
+    def archive_completed(self, older_than_days: int, now: Optional[int] = None) -> int:
+        try:
+            cutoff = (now_timestamp() if now is None else now) - older_than_days * SECONDS_PER_DAY
+            archived = 0
+            for partition in self.storage.partitions():
+                with partition.lock():
+                    old = [task for task in partition.iter_find({"status": "completed"})
+                           if self._archivable(task, cutoff)]
+                    if not old:
+                        continue
+                    self.archive.append(old)
+                    # Removing just these leaves anything written meanwhile in place
+                    partition.delete_many("id", [task["id"] for task in old])
+                    archived += len(old)
+            self.archive.mark_run()
+            return archived
+        except Exception as e:
+            raise Exception(f"Error archiving tasks: {str(e)}")
+
+    @metrics.timed()
+    def get_user_tasks(self, user_email: str, include_archived: bool = False) -> List[Dict]:
+        try:
+            tasks = self.storage.find({"owner": user_email})
+            if include_archived:
+                hot = {task["id"] for task in tasks}
+                tasks = [task.to_dict() for task in self._archived_tasks(user_email)
+                         if task.id not in hot] + tasks
+            return tasks
+        except Exception as e:
+            raise Exception(f"Error getting user tasks: {str(e)}")
+
+    def has_archived(self, user_email: str) -> bool:
+        try:
+            return bool(self.archive.segments(user_email))
+        except Exception as e:
+            raise Exception(f"Error reading archive: {str(e)}")
+
+    @metrics.timed()
+    def find_by_id(self, user_email: str, task_id: str) -> Optional[Dict]:
+        try:
+            return next(iter(self.storage.find({"id": task_id, "owner": user_email})), None)
+        except Exception as e:
+            raise Exception(f"Error finding task: {str(e)}")
+
+    @metrics.timed()
+    def find_by_title(self, user_email: str, title: str) -> Optional[Dict]:
+        try:
+            tasks = self.storage.iter_find({"owner": user_email})
+            return next((task for task in tasks if task["title"].lower() == title.lower()), None)
+        except Exception as e:
+            raise Exception(f"Error finding task: {str(e)}")
+
+    @metrics.timed()
+    def search_tasks(self, user_email: str, query: str,
+                     include_archived: bool = False) -> List[Dict]:
+        try:
+            index = self._index(user_email, include_archived)
+            return [index.tasks[task_id].to_dict() for task_id in index.text.search(query)]
+        except Exception as e:
+            raise Exception(f"Error searching tasks: {str(e)}")
+
+    @metrics.timed()
+    def query_tasks(self, user_email: str, query: TaskQuery,
+                    include_archived: bool = False) -> List[Dict]:
+        try:
+            return query.execute(self._index(user_email, include_archived))
+        except Exception as e:
+            raise Exception(f"Error filtering tasks: {str(e)}")
+
+    @metrics.timed()
+    def get_reminders(self, user_email: str,
+                      today: Optional[date] = None) -> Tuple[List[Dict], List[Dict]]:
+        try:
+            index = self._owner_index(user_email)
+            today = (today or date.today()).toordinal()
+            overdue = index.reminders.due_before(today)
+            upcoming = index.reminders.due_between(today, today + 1)
+            return ([index.tasks[task_id].to_dict() for task_id in overdue],
+                    [index.tasks[task_id].to_dict() for task_id in upcoming])
+        except Exception as e:
+            raise Exception(f"Error getting reminders: {str(e)}")
+
+    @metrics.timed()
+    def get_stats(self, user_email: Optional[str] = None) -> "TaskStats":
+        try:
+            if user_email is not None:
+                return self._owner_index(user_email).stats
+            from .stats import TaskStats
+
+            return TaskStats.merge(self._partition_stats(partition)
+                                   for partition in self.storage.partitions())
+        except Exception as e:
+            raise Exception(f"Error computing stats: {str(e)}")
+
+    @metrics.timed()
+    def add_task(self, task: Task) -> None:
+        try:
+            with self.storage.lock({"owner": task.owner}):
+                index = self._current_index(task.owner)
+                stats = self._current_stats(task.owner)
+                record = task.to_dict()
+                self.storage.insert(record)
+                self._sync_index(task.owner, index, lambda i: i.add(Task.from_dict(record)))
+                self._sync_stats(stats, lambda s: s.add_record(record))
+        except Exception as e:
+            raise Exception(f"Error adding task: {str(e)}")
+
+    @metrics.timed()
+    def add_tasks(self, user_email: str, tasks: List[Task]) -> None:
+        try:
+            with self.storage.lock({"owner": user_email}):
+                index = self._current_index(user_email)
+                stats = self._current_stats(user_email)
+                records = [task.to_dict() for task in tasks]
+                self.storage.insert_many(records)
+
+                def add_all(index: TaskIndex) -> None:
+                    for record in records:
+                        index.add(Task.from_dict(record))
+
+                def count_all(stats: "TaskStats") -> None:
+                    for record in records:
+                        stats.add_record(record)
+
+                self._sync_index(user_email, index, add_all)
+                self._sync_stats(stats, count_all)
+        except Exception as e:
+            raise Exception(f"Error adding tasks: {str(e)}")
+
+    @metrics.timed()
+    def update_task(self, user_email: str, task_id: str, updated_data: Dict) -> Optional[Dict]:
+        try:
+            with self.storage.lock({"owner": user_email}):
+                index = self._current_index(user_email)
+                stats = self._current_stats(user_email)
+                # Only needed to take the old values back out of the stats
+                old = self._stored_task(user_email, task_id) if stats else None
+                updated = self.storage.update({"id": task_id, "owner": user_email}, updated_data)
+                if updated is not None:
+                    self._sync_index(user_email, index, lambda i: i.replace(Task.from_dict(updated)))
+                    self._sync_stats(stats, lambda s: s.replace_record(old, updated))
+                return updated
+        except Exception as e:
+            raise Exception(f"Error updating task: {str(e)}")
+
+    @metrics.timed()
+    def delete_task(self, user_email: str, task_id: str) -> bool:
+        try:
+            with self.storage.lock({"owner": user_email}):
+                index = self._current_index(user_email)
+                stats = self._current_stats(user_email)
+                old = self._stored_task(user_email, task_id) if stats else None
+                deleted = self.storage.delete({"id": task_id, "owner": user_email}) > 0
+                if deleted:
+                    self._sync_index(user_email, index, lambda i: i.remove(task_id))
+                    self._sync_stats(stats, lambda s: s.remove_record(old))
+                return deleted
+        except Exception as e:
+            raise Exception(f"Error deleting task: {str(e)}")
@@ -0,0 +1,88 @@
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Set, Union
+from .index import TaskIndex
+
+SORT_FIELDS = ("created", "due_date", "priority", "status", "title")
+PRIORITY_RANK = {"high": 0, "medium": 1, "low": 2}
+
+
+def _as_set(value: Union[None, str, Iterable[str]]) -> Optional[Set[str]]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.split(",")
+    values = {v.strip().lower() for v in value if v.strip()}
+    return values or None
+
+
+class TaskQuery:
+    def __init__(self, priority: Union[None, str, Iterable[str]] = None,
+                 status: Union[None, str, Iterable[str]] = None,
+                 exclude_status: Union[None, str, Iterable[str]] = None,
+                 due_date: Optional[str] = None, due_from: Optional[str] = None,
+                 due_to: Optional[str] = None, sort: str = "created",
+                 descending: bool = False, limit: Optional[int] = None, offset: int = 0):
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"Invalid sort field (choose from {', '.join(SORT_FIELDS)})")
+        if limit is not None and limit < 0:
+            raise ValueError("Limit must be zero or more")
+        if offset < 0:
+            raise ValueError("Offset must be zero or more")
+        self.priorities = _as_set(priority)
+        self.statuses = _as_set(status)
+        self.exclude_statuses = _as_set(exclude_status)
+        self.due_from = due_date or due_from
+        self.due_to = due_date or due_to
+        self.sort = sort
+        self.descending = descending
+        self.limit = limit
+        self.offset = offset
+
+    @classmethod
+    def from_filters(cls, filters: Optional[Dict]) -> "TaskQuery":
+        return cls(**{key: value for key, value in (filters or {}).items() if value is not None})
+
+    def _candidates(self, index: TaskIndex) -> Optional[Set[str]]:
+        filters = index.filters
+        sets = []
+        if self.priorities:
+            sets.append(filters.with_priority(self.priorities))
+        if self.statuses:
+            sets.append(filters.with_status(self.statuses))
+        if (self.due_from or self.due_to) and self.sort != "due_date":
+            sets.append(filters.due_between(self.due_from, self.due_to))
+        if not sets:
+            candidates = None
+        else:
+            sets.sort(key=len)
+            candidates = sets[0].intersection(*sets[1:])
+        if self.exclude_statuses:
+            excluded = filters.with_status(self.exclude_statuses)
+            if candidates is None:
+                candidates = set(index.tasks).difference(excluded)
+            else:
+                candidates -= excluded
+        return candidates
+
+    def execute(self, index: TaskIndex) -> List[Dict]:
+        candidates = self._candidates(index)
+        if self.sort == "due_date":
+            # Walk the due-date index in order so only one page is materialized
+            ordered = index.filters.iter_by_due(self.due_from, self.due_to, self.descending)
+            if candidates is not None:
+                ordered = (task_id for task_id in ordered if task_id in candidates)
+        else:
+            ordered = index.tasks if candidates is None else (
+                task_id for task_id in index.tasks if task_id in candidates
+            )
+            if self.sort == "created":
+                ordered = reversed(list(ordered)) if self.descending else ordered
+            else:
+                key = {
+                    "priority": lambda task_id: PRIORITY_RANK.get(index.tasks[task_id].priority, 3),
+                    "status": lambda task_id: index.tasks[task_id].status,
+                    "title": lambda task_id: index.tasks[task_id].title.lower(),
+                }[self.sort]
+                ordered = sorted(ordered, key=key, reverse=self.descending)
+        stop = None if self.limit is None else self.offset + self.limit
+        return [index.tasks[task_id].to_dict() for task_id in islice(ordered, self.offset, stop)]
@@ -0,0 +1,180 @@
+import os
+import sys
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, TextIO
+
+PAGE_SIZE_ENV = "TODO_PAGE_SIZE"
+DEFAULT_PAGE_SIZE = 20
+LAYOUTS = ("verbose", "table")
+VERBOSE_FIELDS = ("title", "description", "priority", "status", "due_date")
+TITLE_WIDTH = 40
+DESCRIPTION_WIDTH = 30
+COLUMN_WIDTHS = {"title": TITLE_WIDTH, "description": DESCRIPTION_WIDTH, "priority": 8,
+                 "status": 11, "due_date": 10}
+HISTOGRAM_WIDTH = 30
+
+LABELS = {
+    "title": "Title",
+    "description": "Description",
+    "priority": "Priority",
+    "status": "Status",
+    "due_date": "Due Date",
+}
+
+
+def default_page_size() -> int:
+    try:
+        return max(1, int(os.environ.get(PAGE_SIZE_ENV, DEFAULT_PAGE_SIZE)))
+    except ValueError:
+        return DEFAULT_PAGE_SIZE
+
+
+def _value(task: Dict, field: str) -> str:
+    value = task.get(field) or ""
+    if field == "priority":
+        return value.capitalize()
+    if field == "status":
+        return value.replace('_', ' ').capitalize()
+    return str(value)
+
+
+def _clip(text: str, width: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= width else text[:width - 3] + "..."
+
+
+def render_verbose(tasks: Iterable[Dict], start: int = 1,
+                   fields: Sequence[str] = VERBOSE_FIELDS) -> str:
+    lines: List[str] = []
+    for number, task in enumerate(tasks, start):
+        lines.append(f"\nTask #{number}")
+        lines.extend(f"{LABELS[field]}: {_value(task, field)}" for field in fields)
+    return "\n".join(lines) + "\n"
+
+
+def render_table(tasks: Iterable[Dict], start: int = 1,
+                 fields: Sequence[str] = VERBOSE_FIELDS) -> str:
+    # One line per task; long titles and descriptions are clipped to their column
+    number_width = 5
+
+    def row(number: object, values: Iterable[str]) -> str:
+        cells = "  ".join(f"{value:<{COLUMN_WIDTHS[field]}}" for field, value in zip(fields, values))
+        return f"{number:>{number_width}}  {cells}".rstrip()
+
+    lines = ["\n" + row("#", (LABELS[field] for field in fields))]
+    lines.append("-" * len(lines[0].strip("\n")))
+    for number, task in enumerate(tasks, start):
+        lines.append(row(number, (_clip(_value(task, field), COLUMN_WIDTHS[field])
+                                  for field in fields)))
+    return "\n".join(lines) + "\n"
+
+
+RENDERERS = {"verbose": render_verbose, "table": render_table}
+
+
+class TaskPager:
+    # Formats one page at a time; items from a plain iterator are pulled only as pages are reached
+    def __init__(self, tasks: Iterable[Dict], page_size: Optional[int] = None,
+                 layout: str = "verbose", fields: Sequence[str] = VERBOSE_FIELDS):
+        if layout not in RENDERERS:
+            raise ValueError(f"Unknown layout: {layout}")
+        self.page_size = max(1, page_size or default_page_size())
+        self.layout = layout
+        self.fields = fields
+        self.page = 0
+        if isinstance(tasks, Sequence):
+            self._tasks = tasks
+            self._rest: Optional[Iterator[Dict]] = None
+        else:
+            self._tasks = []
+            self._rest = iter(tasks)
+
+    def _fill(self, count: int) -> None:
+        # Pull far enough ahead to know whether another page follows
+        if self._rest is not None and len(self._tasks) < count:
+            self._tasks.extend(islice(self._rest, count - len(self._tasks)))
+            if len(self._tasks) < count:
+                self._rest = None
+
+    @property
+    def total(self) -> Optional[int]:
+        return len(self._tasks) if self._rest is None else None
+
+    @property
+    def has_previous(self) -> bool:
+        return self.page > 0
+
+    @property
+    def has_next(self) -> bool:
+        self._fill((self.page + 1) * self.page_size + 1)
+        return len(self._tasks) > (self.page + 1) * self.page_size
+
+    def next(self) -> bool:
+        if not self.has_next:
+            return False
+        self.page += 1
+        return True
+
+    def previous(self) -> bool:
+        if not self.has_previous:
+            return False
+        self.page -= 1
+        return True
+
+    def toggle_layout(self) -> str:
+        self.layout = LAYOUTS[(LAYOUTS.index(self.layout) + 1) % len(LAYOUTS)]
+        return self.layout
+
+    def render(self) -> str:
+        start = self.page * self.page_size
+        self._fill(start + self.page_size)
+        visible = self._tasks[start:start + self.page_size]
+        text = RENDERERS[self.layout](visible, start + 1, self.fields)
+        if not (self.has_previous or self.has_next):
+            return text
+        total = self.total
+        last = start + len(visible)
+        if total is None:
+            footer = f"Showing {start + 1}-{last} (page {self.page + 1})"
+        else:
+            pages = max(1, -(-total // self.page_size))
+            footer = f"Showing {start + 1}-{last} of {total} (page {self.page + 1}/{pages})"
+        return f"{text}\n{footer}\n"
+
+    def show(self, out: Optional[TextIO] = None) -> None:
+        out = out or sys.stdout
+        # The whole page goes out in a single write
+        out.write(self.render())
+        out.flush()
+
+
+def _counts(counts: Dict[str, int]) -> str:
+    return ", ".join(f"{label.replace('_', ' ')} {count}" for label, count in counts.items())
+
+
+def render_stats(summary: Dict, scope: str = "Your tasks") -> str:
+    lines = [f"\n=== {scope}: {summary['total']} total ===",
+             f"Completed: {summary['completed']} ({summary['completion_rate']:.1%})",
+             f"Overdue: {summary['overdue']} ({_counts(summary['overdue_by_priority'])})",
+             f"Due in the next 7 days: {summary['due_next_7_days']}",
+             f"By status: {_counts(summary['by_status'])}",
+             f"By priority: {_counts(summary['by_priority'])}",
+             "",
+             f"{'Status':<12}" + "".join(f"{label.capitalize():>9}"
+                                         for label in summary['by_priority'])]
+    for status, row in summary["by_status_priority"].items():
+        lines.append(f"{status.replace('_', ' ').capitalize():<12}"
+                     + "".join(f"{count:>9}" for count in row.values()))
+
+    lines += ["", f"Completion by {summary['bucket']} created:"]
+    for point in summary["completion_over_time"]:
+        lines.append(f"  {point['period']:<10} {point['completed']:>7}/{point['created']:<7} "
+                     f"{point['rate']:>7.1%}")
+    lines += ["", f"Due dates by {summary['bucket']} (open / completed):"]
+    widest = max((point["open"] + point["completed"] for point in summary["due_histogram"]),
+                 default=0)
+    for point in summary["due_histogram"]:
+        # Bars are scaled to the busiest period
+        bar = "#" * round(HISTOGRAM_WIDTH * (point["open"] + point["completed"]) / widest)
+        lines.append(f"  {point['period']:<10} {point['open']:>7} / {point['completed']:<7} {bar}")
+    return "\n".join(lines) + "\n"
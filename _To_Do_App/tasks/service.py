@@ -0,0 +1,181 @@
+import os
+import time
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+from .models import Task, TaskRepository
+from .query import TaskQuery
+from .transfer import DEFAULT_BATCH_SIZE, ImportReport, batched, dedup_key, read_rows, write_rows
+from authentication.validation import Validator
+from utils.helpers import format_timestamp, now_timestamp
+
+TASK_FIELDS = ("title", "description", "priority", "status", "due_date")
+IMPORT_DEFAULTS = {"title": "", "description": "", "priority": "medium", "status": "to_do",
+                   "due_date": ""}
+ADMINS_ENV = "TODO_ADMINS"
+
+
+def is_admin(email: str) -> bool:
+    admins = {admin.strip().casefold() for admin in os.environ.get(ADMINS_ENV, "").split(",")}
+    return bool(email) and email.casefold() in admins
+
+
+class TaskService:
+    def __init__(self, task_repo: Optional[TaskRepository] = None):
+        self.validator = Validator()
+        self.task_repo = task_repo or TaskRepository()
+
+    def create_task(self, owner: str, title: str, description: str = "",
+                    priority: str = "medium", status: str = "to_do",
+                    due_date: str = "") -> Dict:
+        self._validate({
+            "title": title,
+            "description": description,
+            "priority": priority,
+            "status": status,
+            "due_date": due_date
+        })
+        task = Task(title.strip(), description.strip(), priority, status, due_date, owner)
+        self.task_repo.add_task(task)
+        return task.to_dict()
+
+    def get_task(self, owner: str, task_id: str) -> Dict:
+        task = self.task_repo.find_by_id(owner, task_id)
+        if task is None:
+            raise ValueError(f"Task not found: {task_id}")
+        return task
+
+    def list_tasks(self, owner: str, filters: Union[None, Dict, TaskQuery] = None,
+                   include_archived: bool = False) -> List[Dict]:
+        if not filters:
+            return self.task_repo.get_user_tasks(owner, include_archived)
+        query = filters if isinstance(filters, TaskQuery) else TaskQuery.from_filters(filters)
+        return self.task_repo.query_tasks(owner, query, include_archived)
+
+    def search_tasks(self, owner: str, term: str, include_archived: bool = False) -> List[Dict]:
+        if not term.strip():
+            raise ValueError("Please enter a search term.")
+        return self.task_repo.search_tasks(owner, term, include_archived)
+
+    def has_archived(self, owner: str) -> bool:
+        return self.task_repo.has_archived(owner)
+
+    def get_reminders(self, owner: str) -> Tuple[List[Dict], List[Dict]]:
+        return self.task_repo.get_reminders(owner)
+
+    def get_stats(self, owner: str, all_users: bool = False, bucket: str = "month",
+                  today: Optional[date] = None) -> Dict:
+        if all_users and not is_admin(owner):
+            raise ValueError("Only admins can view statistics for all users")
+        stats = self.task_repo.get_stats(None if all_users else owner)
+        return stats.summary(today, bucket)
+
+    def update_task(self, owner: str, task_id: str, updated_data: Dict) -> Dict:
+        updated_data = {field: value for field, value in updated_data.items()
+                        if field in TASK_FIELDS}
+        self._validate(updated_data)
+        for field in ("priority", "status"):
+            if field in updated_data:
+                updated_data[field] = updated_data[field].lower()
+        if updated_data.get("status") == "completed":
+            current = self.task_repo.find_by_id(owner, task_id)
+            if current is not None and current["status"] != "completed":
+                updated_data["completed_at"] = format_timestamp(now_timestamp())
+        task = self.task_repo.update_task(owner, task_id, updated_data)
+        if task is None:
+            raise ValueError(f"Task not found: {task_id}")
+        return task
+
+    def complete_tasks(self, owner: str, task_ids: Iterable[str]) -> List[str]:
+        completed = []
+        for task_id in task_ids:
+            task = self.task_repo.find_by_id(owner, task_id)
+            if task is None or task['status'] == 'completed':
+                continue
+            self.task_repo.update_task(owner, task_id, {
+                "status": "completed",
+                "completed_at": format_timestamp(now_timestamp())
+            })
+            completed.append(task_id)
+        return completed
+
+    def archive_tasks(self, owner: str, days: int) -> int:
+        if not is_admin(owner):
+            raise ValueError("Only admins can archive tasks")
+        if days < 0:
+            raise ValueError("Days must be zero or more")
+        return self.task_repo.archive_completed(days)
+
+    def delete_tasks(self, owner: str, task_ids: Iterable[str]) -> List[str]:
+        return [task_id for task_id in task_ids if self.task_repo.delete_task(owner, task_id)]
+
+    def import_tasks(self, owner: str, file_path: str,
+                     batch_size: int = DEFAULT_BATCH_SIZE) -> ImportReport:
+        if batch_size < 1:
+            raise ValueError("Batch size must be at least 1")
+        report = ImportReport()
+        started = time.perf_counter()
+        seen = {dedup_key(task) for task in self.task_repo.get_user_tasks(owner)}
+
+        # Batches are journaled and the store is rewritten once, where its layout allows
+        with self.task_repo.storage.bulk():
+            for batch in batched(enumerate(read_rows(file_path), 1), batch_size):
+                records = [self._import_record(row) for _, row in batch]
+                errors = self.validator.validate_many(records)
+                tasks = []
+                for i, (row_number, _) in enumerate(batch):
+                    record = records[i]
+                    row_errors = [messages[i] for messages in errors.values() if messages[i]]
+                    if not isinstance(record["description"], str):
+                        row_errors.append("description must be a string")
+                    if row_errors:
+                        report.reject(row_number, "; ".join(row_errors))
+                        continue
+                    key = dedup_key(record)
+                    if key in seen:
+                        report.duplicates += 1
+                        continue
+                    seen.add(key)
+                    tasks.append(Task(record["title"], record["description"],
+                                      record["priority"].lower(), record["status"].lower(),
+                                      record["due_date"], owner))
+                # One storage commit per batch
+                if tasks:
+                    self.task_repo.add_tasks(owner, tasks)
+                    report.imported += len(tasks)
+                    report.batches += 1
+                report.rows += len(batch)
+
+        report.elapsed = time.perf_counter() - started
+        return report
+
+    def export_tasks(self, owner: str, file_path: str,
+                     filters: Union[None, Dict, TaskQuery] = None) -> int:
+        tasks = self.list_tasks(owner, filters)
+        write_rows(file_path, tasks)
+        return len(tasks)
+
+    @staticmethod
+    def _import_record(row: Dict) -> Dict:
+        record = {}
+        for field, default in IMPORT_DEFAULTS.items():
+            value = row.get(field)
+            if isinstance(value, str):
+                value = value.strip()
+            record[field] = default if value is None or value == "" else value
+        return record
+
+    def _validate(self, data: Dict) -> None:
+        if "title" in data and not data["title"].strip():
+            raise ValueError("Title is required")
+        if "priority" in data:
+            is_valid, error = self.validator.validate_priority(data["priority"])
+            if not is_valid:
+                raise ValueError(error)
+        if "status" in data:
+            is_valid, error = self.validator.validate_status(data["status"])
+            if not is_valid:
+                raise ValueError(error)
+        if "due_date" in data:
+            is_valid, error = self.validator.validate_date(data["due_date"])
+            if not is_valid:
+                raise ValueError(error)
@@ -0,0 +1,297 @@
+import os
+from array import array
+from collections import Counter
+from datetime import date
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+from .models import Task, Priority, Status, PRIORITY_CODES, STATUS_CODES
+from .table import RAW_CODE, RAW_VALUE
+
+STATS_NUMPY_ENV = "TODO_STATS_NUMPY"
+BUCKETS = ("day", "week", "month")
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+SECONDS_PER_DAY = 86400
+OTHER = 3
+# Slots in a due-date row: open tasks per priority (plus "other"), then completed ones
+COMPLETED_SLOT = 4
+DUE_WIDTH = 5
+
+_STATUS_INTS = {label: int(code) for label, code in STATUS_CODES.items()}
+_PRIORITY_INTS = {label: int(code) for label, code in PRIORITY_CODES.items()}
+
+_UNLOADED = object()
+numpy: Any = _UNLOADED
+
+
+def _numpy() -> Any:
+    # NumPy is optional and slow to import, so it's only looked up when stats are first built
+    global numpy
+    if numpy is _UNLOADED:
+        if os.environ.get(STATS_NUMPY_ENV, "1").lower() in ("0", "false", "off"):
+            numpy = None
+        else:
+            try:
+                import numpy as module
+            except ImportError:
+                module = None
+            numpy = module
+    return numpy
+
+
+@lru_cache(maxsize=65536)
+def _date_ordinal(text: str) -> int:
+    try:
+        parsed = date.fromisoformat(text)
+    except (TypeError, ValueError):
+        return RAW_VALUE
+    return parsed.toordinal() if parsed.isoformat() == text else RAW_VALUE
+
+
+def _created_day(value: Any) -> int:
+    if isinstance(value, int) and not isinstance(value, bool):
+        return EPOCH_ORDINAL + value // SECONDS_PER_DAY
+    if isinstance(value, str):
+        return _date_ordinal(value[:10])
+    return RAW_VALUE
+
+
+def _slot(code: int) -> int:
+    return code if 0 <= code < OTHER else OTHER
+
+
+def _period(ordinal: int, bucket: str) -> str:
+    day = date.fromordinal(ordinal)
+    if bucket == "week":
+        year, week, _ = day.isocalendar()
+        return f"{year}-W{week:02d}"
+    if bucket == "month":
+        return f"{day.year:04d}-{day.month:02d}"
+    return day.isoformat()
+
+
+def _group_numpy(np: Any, keys: Any, slots: Any, width: int) -> Dict[int, List[int]]:
+    valid = keys != RAW_VALUE
+    keys = keys[valid]
+    slots = slots[valid]
+    if not len(keys):
+        return {}
+    low = int(keys.min())
+    span = int(keys.max()) - low + 1
+    # A dense bincount is fastest, unless a few far-off dates would make it huge
+    if span * width <= 4 * len(keys) + 65536:
+        counts = np.bincount((keys - low) * width + slots,
+                             minlength=span * width).reshape(span, width)
+        rows = np.flatnonzero(counts.any(axis=1))
+        return dict(zip((rows + low).tolist(), counts[rows].tolist()))
+    unique, inverse = np.unique(keys, return_inverse=True)
+    counts = np.zeros((len(unique), width), dtype=np.int64)
+    np.add.at(counts, (inverse, slots), 1)
+    return dict(zip(unique.tolist(), counts.tolist()))
+
+
+def _group_python(keys: Iterable[int], slots: Iterable[int], width: int) -> Dict[int, List[int]]:
+    grouped: Dict[int, List[int]] = {}
+    for (key, slot), count in Counter(zip(keys, slots)).items():
+        if key == RAW_VALUE:
+            continue
+        row = grouped.get(key)
+        if row is None:
+            row = grouped[key] = [0] * width
+        row[slot] += count
+    return grouped
+
+
+class TaskStats:
+    # Aggregates kept as counts, so a summary never walks the tasks and edits are O(1)
+    def __init__(self, tasks: Iterable[Task] = (), use_numpy: Optional[bool] = None):
+        self.matrix = [[0] * (OTHER + 1) for _ in range(OTHER + 1)]
+        self.due: Dict[int, List[int]] = {}
+        self.created: Dict[int, List[int]] = {}
+        statuses, priorities, due, created = array('b'), array('b'), array('q'), array('q')
+        for task in tasks:
+            codes = self._task_codes(task)
+            statuses.append(codes[0])
+            priorities.append(codes[1])
+            due.append(codes[2])
+            created.append(codes[3])
+        self._aggregate(statuses, priorities, due, created, use_numpy)
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict], use_numpy: Optional[bool] = None) -> "TaskStats":
+        statuses, priorities, due, created = array('b'), array('b'), array('q'), array('q')
+        # This loop is the whole cost of a cold build, so it avoids per-record calls
+        status_code, priority_code = _STATUS_INTS.get, _PRIORITY_INTS.get
+        add_status, add_priority = statuses.append, priorities.append
+        add_due, add_created = due.append, created.append
+        for record in records:
+            get = record.get
+            add_status(status_code(get("status"), RAW_CODE))
+            add_priority(priority_code(get("priority"), RAW_CODE))
+            due_date = get("due_date")
+            add_due(_date_ordinal(due_date) if due_date.__class__ is str else RAW_VALUE)
+            created_at = get("created_at")
+            add_created(_date_ordinal(created_at[:10]) if created_at.__class__ is str
+                        else _created_day(created_at))
+        stats = cls(use_numpy=use_numpy)
+        stats._aggregate(statuses, priorities, due, created, use_numpy)
+        return stats
+
+    @classmethod
+    def merge(cls, parts: Iterable["TaskStats"]) -> "TaskStats":
+        merged = cls()
+        for part in parts:
+            for row, counts in zip(merged.matrix, part.matrix):
+                for column, count in enumerate(counts):
+                    row[column] += count
+            for target, source in ((merged.due, part.due), (merged.created, part.created)):
+                for key, counts in source.items():
+                    row = target.get(key)
+                    if row is None:
+                        target[key] = list(counts)
+                    else:
+                        for slot, count in enumerate(counts):
+                            row[slot] += count
+        return merged
+
+    @staticmethod
+    def _task_codes(task: Task) -> tuple:
+        ordinal = task.due_ordinal
+        return (STATUS_CODES.get(task.status, RAW_CODE), PRIORITY_CODES.get(task.priority, RAW_CODE),
+                RAW_VALUE if ordinal is None else ordinal, _created_day(task.created))
+
+    @staticmethod
+    def _record_codes(record: Dict) -> tuple:
+        due_date = record.get("due_date")
+        return (STATUS_CODES.get(record.get("status"), RAW_CODE),
+                PRIORITY_CODES.get(record.get("priority"), RAW_CODE),
+                _date_ordinal(due_date) if isinstance(due_date, str) else RAW_VALUE,
+                _created_day(record.get("created_at")))
+
+    def _aggregate(self, statuses: Sequence[int], priorities: Sequence[int], due: Sequence[int],
+                   created: Sequence[int], use_numpy: Optional[bool]) -> None:
+        if not len(statuses):
+            return
+        np = _numpy() if use_numpy is not False else None
+        if use_numpy and np is None:
+            raise ValueError("NumPy is not installed")
+        if np is not None:
+            status = np.frombuffer(statuses, dtype=np.int8).astype(np.int64)
+            priority = np.frombuffer(priorities, dtype=np.int8).astype(np.int64)
+            status_slot = np.where((status >= 0) & (status < OTHER), status, OTHER)
+            priority_slot = np.where((priority >= 0) & (priority < OTHER), priority, OTHER)
+            counts = np.bincount(status_slot * (OTHER + 1) + priority_slot,
+                                 minlength=(OTHER + 1) ** 2)
+            self.matrix = counts.reshape(OTHER + 1, OTHER + 1).tolist()
+            completed = status == Status.COMPLETED
+            self.due = _group_numpy(np, np.frombuffer(due, dtype=np.int64),
+                                    np.where(completed, COMPLETED_SLOT, priority_slot), DUE_WIDTH)
+            self.created = _group_numpy(np, np.frombuffer(created, dtype=np.int64),
+                                        completed.astype(np.int64), 2)
+            return
+
+        for (status, priority), count in Counter(zip(statuses, priorities)).items():
+            self.matrix[_slot(status)][_slot(priority)] += count
+        completed = Status.COMPLETED
+        self.due = _group_python(due, (COMPLETED_SLOT if status == completed else _slot(priority)
+                                       for status, priority in zip(statuses, priorities)),
+                                 DUE_WIDTH)
+        self.created = _group_python(created, (int(status == completed) for status in statuses), 2)
+
+    def _apply(self, codes: tuple, delta: int) -> None:
+        status, priority, due, created = codes
+        completed = status == Status.COMPLETED
+        self.matrix[_slot(status)][_slot(priority)] += delta
+        for target, key, slot, width in ((self.due, due, COMPLETED_SLOT if completed
+                                          else _slot(priority), DUE_WIDTH),
+                                         (self.created, created, int(completed), 2)):
+            if key == RAW_VALUE:
+                continue
+            row = target.get(key)
+            if row is None:
+                row = target[key] = [0] * width
+            row[slot] += delta
+            if not any(row):
+                del target[key]
+
+    def add(self, task: Task) -> None:
+        self._apply(self._task_codes(task), 1)
+
+    def remove(self, task: Task) -> None:
+        self._apply(self._task_codes(task), -1)
+
+    def add_record(self, record: Dict) -> None:
+        self._apply(self._record_codes(record), 1)
+
+    def remove_record(self, record: Dict) -> None:
+        self._apply(self._record_codes(record), -1)
+
+    def replace_record(self, old: Dict, new: Dict) -> None:
+        self.remove_record(old)
+        self.add_record(new)
+
+    @property
+    def total(self) -> int:
+        return sum(map(sum, self.matrix))
+
+    def summary(self, today: Optional[date] = None, bucket: str = "month") -> Dict:
+        if bucket not in BUCKETS:
+            raise ValueError(f"Unknown bucket: {bucket}. Choose from {', '.join(BUCKETS)}")
+        today = (today or date.today()).toordinal()
+        statuses = [status.label for status in Status] + ["other"]
+        priorities = [priority.label for priority in Priority] + ["other"]
+
+        def labelled(labels: List[str], counts: List[int]) -> Dict[str, int]:
+            # The "other" slot only shows up when something odd is stored
+            return {label: count for label, count in zip(labels, counts)
+                    if label != "other" or count}
+
+        by_status = [sum(row) for row in self.matrix]
+        by_priority = [sum(column) for column in zip(*self.matrix)]
+        overdue = [0] * (OTHER + 1)
+        due_soon = 0
+        due_periods: Dict[str, List[int]] = {}
+        for ordinal in sorted(self.due):
+            row = self.due[ordinal]
+            open_count = sum(row[:COMPLETED_SLOT])
+            if ordinal < today:
+                for slot in range(OTHER + 1):
+                    overdue[slot] += row[slot]
+            elif ordinal <= today + 7:
+                due_soon += open_count
+            counts = due_periods.setdefault(_period(ordinal, bucket), [0, 0])
+            counts[0] += open_count
+            counts[1] += row[COMPLETED_SLOT]
+
+        created_periods: Dict[str, List[int]] = {}
+        for ordinal in sorted(self.created):
+            row = self.created[ordinal]
+            counts = created_periods.setdefault(_period(ordinal, bucket), [0, 0])
+            counts[0] += row[0] + row[1]
+            counts[1] += row[1]
+
+        total = sum(by_status)
+        completed = by_status[Status.COMPLETED]
+        return {
+            "total": total,
+            "completed": completed,
+            "completion_rate": round(completed / total, 4) if total else 0.0,
+            "by_status": labelled(statuses, by_status),
+            "by_priority": labelled(priorities, by_priority),
+            "by_status_priority": {
+                status: labelled(priorities, row)
+                for status, row in zip(statuses, self.matrix) if status != "other" or any(row)
+            },
+            "overdue": sum(overdue),
+            "overdue_by_priority": labelled(priorities, overdue),
+            "due_next_7_days": due_soon,
+            "bucket": bucket,
+            "completion_over_time": [
+                {"period": period, "created": created, "completed": done,
+                 "rate": round(done / created, 4) if created else 0.0}
+                for period, (created, done) in created_periods.items()
+            ],
+            "due_histogram": [
+                {"period": period, "open": open_count, "completed": done}
+                for period, (open_count, done) in due_periods.items()
+            ],
+        }
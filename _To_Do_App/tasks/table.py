@@ -0,0 +1,111 @@
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+from utils.helpers import encode_date, encode_timestamp, format_date, format_timestamp
+from .models import Task, Priority, Status, PRIORITY_CODES, STATUS_CODES
+
+RAW_CODE = -1
+RAW_VALUE = -(2 ** 63)
+_MISSING = object()
+
+
+class TaskTable:
+    def __init__(self):
+        self.ids: List[str] = []
+        self.titles: List[str] = []
+        self.descriptions: List[str] = []
+        self.priorities = array('b')
+        self.statuses = array('b')
+        self.due = array('q')
+        self.owners = array('l')
+        self.created = array('q')
+        self.owner_names: List[str] = []
+        self._owner_codes: Dict[str, int] = {}
+        # Values that don't fit a column's encoding, keyed by (row, field)
+        self._raw: Dict[Tuple[int, str], Any] = {}
+        self._extra: Dict[int, Dict] = {}
+
+    @classmethod
+    def from_dicts(cls, records: Iterable[Dict]) -> "TaskTable":
+        table = cls()
+        table.extend(records)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def owner_code(self, owner: str) -> int:
+        code = self._owner_codes.get(owner)
+        if code is None:
+            code = self._owner_codes[owner] = len(self.owner_names)
+            self.owner_names.append(owner)
+        return code
+
+    def _encode(self, row: int, field: str, value: Any, encoded: Any, sentinel: int) -> int:
+        if isinstance(encoded, int) and not isinstance(encoded, bool) and encoded != sentinel:
+            return encoded
+        self._raw[(row, field)] = value
+        return sentinel
+
+    def append(self, record: Dict) -> None:
+        row = len(self.ids)
+        for field, column in (("id", self.ids), ("title", self.titles),
+                              ("description", self.descriptions)):
+            value = record.get(field, _MISSING)
+            if value is _MISSING:
+                self._raw[(row, field)] = _MISSING
+            column.append(None if value is _MISSING else value)
+
+        priority = record.get("priority", _MISSING)
+        self.priorities.append(self._encode(row, "priority", priority,
+                                            PRIORITY_CODES.get(priority), RAW_CODE))
+        status = record.get("status", _MISSING)
+        self.statuses.append(self._encode(row, "status", status,
+                                          STATUS_CODES.get(status), RAW_CODE))
+        due_date = record.get("due_date", _MISSING)
+        self.due.append(self._encode(row, "due_date", due_date,
+                                     encode_date(None if due_date is _MISSING else due_date),
+                                     RAW_VALUE))
+        owner = record.get("owner", _MISSING)
+        self.owners.append(RAW_CODE if owner is _MISSING else self.owner_code(owner))
+        if owner is _MISSING:
+            self._raw[(row, "owner")] = _MISSING
+        created_at = record.get("created_at", _MISSING)
+        self.created.append(self._encode(row, "created_at", created_at,
+                                         encode_timestamp(None if created_at is _MISSING else created_at),
+                                         RAW_VALUE))
+
+        extra = {key: value for key, value in record.items() if key not in Task.fields}
+        if extra:
+            self._extra[row] = extra
+
+    def extend(self, records: Iterable[Dict]) -> None:
+        for record in records:
+            self.append(record)
+
+    def row(self, row: int) -> Dict:
+        values = {
+            "id": self.ids[row],
+            "title": self.titles[row],
+            "description": self.descriptions[row],
+            "priority": Priority(self.priorities[row]).label
+                        if self.priorities[row] != RAW_CODE else None,
+            "status": Status(self.statuses[row]).label
+                      if self.statuses[row] != RAW_CODE else None,
+            "due_date": format_date(self.due[row]) if self.due[row] != RAW_VALUE else None,
+            "owner": self.owner_names[self.owners[row]] if self.owners[row] != RAW_CODE else None,
+            "created_at": format_timestamp(self.created[row])
+                          if self.created[row] != RAW_VALUE else None,
+        }
+        record = {}
+        for field in Task.fields:
+            value = self._raw.get((row, field), values[field])
+            if value is not _MISSING:
+                record[field] = value
+        record.update(self._extra.get(row, {}))
+        return record
+
+    def __iter__(self) -> Iterator[Dict]:
+        return (self.row(i) for i in range(len(self)))
+
+    def to_dicts(self) -> List[Dict]:
+        return list(self)
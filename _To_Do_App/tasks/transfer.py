@@ -0,0 +1,91 @@
+import io
+import csv
+import hashlib
+from itertools import chain, islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+from utils.streaming import atomic_write, iter_records, write_records
+
+CSV_FIELDS = ("id", "title", "description", "priority", "status", "due_date", "owner", "created_at")
+DEFAULT_BATCH_SIZE = 1000
+MAX_REPORTED_ERRORS = 100
+
+
+class ImportReport:
+    def __init__(self):
+        self.rows = 0
+        self.imported = 0
+        self.duplicates = 0
+        self.rejected = 0
+        self.batches = 0
+        self.elapsed = 0.0
+        # Only the first rejections are kept so huge bad files can't grow the report
+        self.errors: List[Tuple[int, str]] = []
+
+    def reject(self, row: int, error: str) -> None:
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append((row, error))
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed if self.elapsed else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            "rows": self.rows,
+            "imported": self.imported,
+            "duplicates": self.duplicates,
+            "rejected": self.rejected,
+            "batches": self.batches,
+            "seconds": round(self.elapsed, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+            "errors": [f"row {row}: {error}" for row, error in self.errors],
+        }
+
+
+def is_csv(file_path: str) -> bool:
+    return Path(file_path).suffix.lower() == ".csv"
+
+
+def read_rows(file_path: str) -> Iterator[Dict]:
+    if not Path(file_path).exists():
+        raise FileNotFoundError(f"No such file: {file_path}")
+    if not is_csv(file_path):
+        yield from iter_records(file_path)
+        return
+    with open(file_path, 'r', encoding='utf-8', newline='') as f:
+        yield from csv.DictReader(f)
+
+
+def batched(items: Iterable, size: int) -> Iterator[List]:
+    items = iter(items)
+    while True:
+        batch = list(islice(items, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _csv_chunks(records: Iterable[Dict]) -> Iterator[str]:
+    for batch in batched(records, DEFAULT_BATCH_SIZE):
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, CSV_FIELDS, extrasaction='ignore')
+        writer.writerows(batch)
+        yield buffer.getvalue()
+
+
+def write_rows(file_path: str, records: Iterable[Dict]) -> None:
+    if is_csv(file_path):
+        header = io.StringIO()
+        csv.DictWriter(header, CSV_FIELDS).writeheader()
+        atomic_write(Path(file_path), chain([header.getvalue()], _csv_chunks(records)))
+    else:
+        write_records(file_path, records)
+
+
+def dedup_key(task: Dict) -> bytes:
+    # A short digest keeps the seen-set small on million-row imports
+    text = "\x1f".join((task.get("title", "").strip().casefold(),
+                        task.get("description", "").strip(), task.get("due_date", "")))
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=12).digest()
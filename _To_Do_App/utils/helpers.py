@@ -0,0 +1,83 @@
+import json
+import time
+import secrets
+from datetime import date, datetime, timedelta
+from typing import Any, Union
+from utils import metrics
+
+# orjson is optional and slow to import, so it is only looked up on the first JSON call
+_UNLOADED = object()
+orjson: Any = _UNLOADED
+
+
+def _load_orjson() -> None:
+    global orjson
+    try:
+        import orjson as module
+    except ImportError:
+        module = None
+    orjson = module
+
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+_EPOCH = datetime(1970, 1, 1)
+
+
+def generate_id() -> str:
+    return f"{time.time_ns() // 1_000_000:011x}{secrets.token_hex(4)}"
+
+
+def json_dumps(data: Any) -> str:
+    started = time.perf_counter() if metrics.active else None
+    if orjson is _UNLOADED:
+        _load_orjson()
+    if orjson is not None:
+        text = orjson.dumps(data).decode()
+    else:
+        text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    if started is not None:
+        metrics.observe("json.serialize", time.perf_counter() - started)
+    return text
+
+
+def json_loads(text: str) -> Any:
+    started = time.perf_counter() if metrics.active else None
+    if orjson is _UNLOADED:
+        _load_orjson()
+    data = orjson.loads(text) if orjson is not None else json.loads(text)
+    if started is not None:
+        metrics.observe("json.parse", time.perf_counter() - started)
+    return data
+
+
+def now_timestamp() -> int:
+    return int((datetime.now() - _EPOCH).total_seconds())
+
+
+def format_timestamp(value: Union[int, str, None]) -> Union[str, None]:
+    if isinstance(value, int):
+        return (_EPOCH + timedelta(seconds=value)).strftime(TIMESTAMP_FORMAT)
+    return value
+
+
+def encode_timestamp(value: Union[str, None]) -> Union[int, str, None]:
+    try:
+        seconds = int((datetime.strptime(value, TIMESTAMP_FORMAT) - _EPOCH).total_seconds())
+    except (TypeError, ValueError):
+        return value
+    # Only keep the integer form when it formats back to the exact same string
+    return seconds if format_timestamp(seconds) == value else value
+
+
+def format_date(value: Union[int, str, None]) -> Union[str, None]:
+    if isinstance(value, int):
+        return date.fromordinal(value).isoformat()
+    return value
+
+
+def encode_date(value: Union[str, None]) -> Union[int, str, None]:
+    try:
+        parsed = date.fromisoformat(value)
+    except (TypeError, ValueError):
+        return value
+    return parsed.toordinal() if parsed.isoformat() == value else value
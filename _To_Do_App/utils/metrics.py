@@ -0,0 +1,177 @@
+import os
+import sys
+import atexit
+import functools
+import threading
+from bisect import bisect_left
+from time import perf_counter
+from typing import Callable, Dict, List, Optional
+
+METRICS_ENV = "TODO_METRICS"
+METRICS_FILE_ENV = "TODO_METRICS_FILE"
+BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+# Read directly on the hottest paths, where even a wrapper call would show up
+active = False
+_summary_at_exit = False
+_prometheus_path: Optional[str] = None
+_exit_registered = False
+_lock = threading.Lock()
+
+
+class Histogram:
+    def __init__(self):
+        # One slot per bucket plus the +Inf overflow
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        # Upper bound of the bucket holding the q-th observation
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+
+_histograms: Dict[str, Histogram] = {}
+_counters: Dict[str, int] = {}
+
+
+def enable(summary: bool = True, prometheus_path: Optional[str] = None) -> None:
+    global active, _summary_at_exit, _prometheus_path, _exit_registered
+    active = True
+    _summary_at_exit = _summary_at_exit or summary
+    _prometheus_path = prometheus_path or _prometheus_path
+    if not _exit_registered:
+        atexit.register(_at_exit)
+        _exit_registered = True
+
+
+def disable() -> None:
+    global active
+    active = False
+
+
+def reset() -> None:
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
+
+
+def observe(name: str, seconds: float) -> None:
+    if not active:
+        return
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = Histogram()
+        histogram.observe(seconds)
+
+
+def count(name: str, amount: int = 1) -> None:
+    if not active:
+        return
+    with _lock:
+        _counters[name] = _counters.get(name, 0) + amount
+
+
+def timed(name: Optional[str] = None) -> Callable:
+    def decorate(func: Callable) -> Callable:
+        op = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not active:
+                return func(*args, **kwargs)
+            started = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                observe(op, perf_counter() - started)
+        return wrapper
+    return decorate
+
+
+def summary() -> str:
+    with _lock:
+        histograms = sorted(_histograms.items(), key=lambda item: -item[1].total)
+        counters = sorted(_counters.items())
+    lines = [f"{'operation':<36} {'count':>8} {'total_ms':>10} {'mean_us':>10} "
+             f"{'p50_us':>10} {'p95_us':>10} {'max_us':>10}"]
+    for name, h in histograms:
+        lines.append(f"{name:<36} {h.count:>8} {h.total * 1e3:>10.2f} "
+                     f"{h.total / h.count * 1e6:>10.1f} {h.quantile(0.5) * 1e6:>10.1f} "
+                     f"{h.quantile(0.95) * 1e6:>10.1f} {h.max * 1e6:>10.1f}")
+    for name, value in counters:
+        lines.append(f"{name:<36} {value:>8}")
+    return "\n".join(lines)
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text() -> str:
+    with _lock:
+        histograms = sorted(_histograms.items())
+        counters = sorted(_counters.items())
+    lines: List[str] = [
+        "# HELP todo_operation_seconds Latency of instrumented operations",
+        "# TYPE todo_operation_seconds histogram",
+    ]
+    for name, h in histograms:
+        op = _label(name)
+        cumulative = 0
+        for bound, count in zip(BUCKETS, h.counts):
+            cumulative += count
+            lines.append(f'todo_operation_seconds_bucket{{op="{op}",le="{bound}"}} {cumulative}')
+        lines.append(f'todo_operation_seconds_bucket{{op="{op}",le="+Inf"}} {h.count}')
+        lines.append(f'todo_operation_seconds_sum{{op="{op}"}} {h.total}')
+        lines.append(f'todo_operation_seconds_count{{op="{op}"}} {h.count}')
+    for name, value in counters:
+        lines.append(f"# TYPE todo_{name}_total counter")
+        lines.append(f"todo_{name}_total {value}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(file_path: str, text: Optional[str] = None) -> None:
+    from pathlib import Path
+    from utils.streaming import atomic_write
+
+    atomic_write(Path(file_path), text or prometheus_text())
+
+
+def _at_exit() -> None:
+    if not active:
+        return
+    # Render both before writing, so the export doesn't count its own bytes
+    report = summary() if _summary_at_exit else None
+    if _prometheus_path:
+        try:
+            write_prometheus(_prometheus_path, prometheus_text())
+        except Exception as e:
+            print(f"Failed to write metrics: {str(e)}", file=sys.stderr)
+    if report is not None:
+        print(report, file=sys.stderr)
+
+
+def configure_from_env() -> None:
+    summary_flag = os.environ.get(METRICS_ENV, "").lower() in ("1", "true", "on")
+    path = os.environ.get(METRICS_FILE_ENV)
+    if summary_flag or path:
+        enable(summary=summary_flag, prometheus_path=path)
+
+
+configure_from_env()
@@ -0,0 +1,1022 @@
+import os
+import json
+import mmap
+import atexit
+import hashlib
+import sqlite3
+import threading
+from array import array
+from contextlib import ExitStack, contextmanager, nullcontext
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from utils import metrics
+from utils.helpers import json_dumps, json_loads
+from utils.streaming import (JSONL_SUFFIX, atomic_write, dump_records, is_jsonl, iter_file,
+                             write_records)
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+STORAGE_BACKEND_ENV = "TODO_STORAGE"
+JOURNAL_ENV = "TODO_JOURNAL"
+JOURNAL_SYNC_ENV = "TODO_JOURNAL_SYNC"
+STREAMING_ENV = "TODO_STREAMING"
+JSON_FORMAT_ENV = "TODO_JSON_FORMAT"
+SHARDS_ENV = "TODO_SHARDS"
+
+_UNLOADED = object()
+_STORAGES: Dict[Tuple[str, Path, Tuple[str, ...], Optional[str]], "Storage"] = {}
+
+
+def _matches(item: Dict, match: Dict) -> bool:
+    return all(item.get(field) == value for field, value in match.items())
+
+
+def _stat(path: Path) -> Optional[Tuple[int, int, int]]:
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+
+def _env_flag(name: str) -> bool:
+    return os.environ.get(name, "").lower() in ("1", "true", "on")
+
+
+def _replay_stream(items: Iterable[Dict], records: List[Dict]) -> Iterator[Dict]:
+    # Same result as applying the journal records in order, one item at a time
+    applied = set()
+    # Records that match on an id can only touch the item with that id, so each item
+    # looks up its own records instead of testing the whole journal
+    by_id: Dict[Any, List[int]] = {}
+    unkeyed: List[int] = []
+    for position, record in enumerate(records):
+        if record["op"] == "insert":
+            continue
+        if "id" in record["match"]:
+            by_id.setdefault(record["match"]["id"], []).append(position)
+        else:
+            unkeyed.append(position)
+
+    def apply(item: Dict, start: int) -> Optional[Dict]:
+        positions = by_id.get(item.get("id"), ())
+        if unkeyed:
+            positions = sorted((*positions, *unkeyed))
+        for position in positions:
+            if position < start or position in applied:
+                continue
+            record = records[position]
+            if not _matches(item, record["match"]):
+                continue
+            if record["op"] == "delete":
+                return None
+            item = {**item, **record["data"]}
+            # An update only touches its first match
+            applied.add(position)
+        return item
+
+    for item in items:
+        item = apply(item, 0)
+        if item is not None:
+            yield item
+    for position, record in enumerate(records):
+        if record["op"] == "insert":
+            item = apply(dict(record["item"]), position + 1)
+            if item is not None:
+                yield item
+
+
+class Storage:
+    # `match` lets layouts that split records scope a lock or signature to one part
+    def lock(self, match: Optional[Dict] = None):
+        return nullcontext()
+
+    def signature(self, match: Optional[Dict] = None) -> Any:
+        raise NotImplementedError
+
+    def bulk(self):
+        # Wraps a run of many writes; layouts that can defer work until it ends override this
+        return nullcontext()
+
+    def partitions(self, match: Optional[Dict] = None) -> List["Storage"]:
+        # The separately locked parts that may hold matching records
+        return [self]
+
+    def load(self) -> List[Dict]:
+        raise NotImplementedError
+
+    def save(self, items: List[Dict]) -> None:
+        raise NotImplementedError
+
+    def find(self, match: Dict) -> List[Dict]:
+        raise NotImplementedError
+
+    def insert(self, item: Dict) -> None:
+        raise NotImplementedError
+
+    def insert_many(self, items: List[Dict]) -> None:
+        for item in items:
+            self.insert(item)
+
+    def update(self, match: Dict, updated_data: Dict) -> Optional[Dict]:
+        raise NotImplementedError
+
+    def delete(self, match: Dict) -> int:
+        raise NotImplementedError
+
+    def delete_many(self, field: str, values: Iterable[Any]) -> int:
+        return sum(self.delete({field: value}) for value in values)
+
+    def iter_find(self, match: Dict) -> Iterator[Dict]:
+        return iter(self.find(match))
+
+    def missing(self, field: str) -> bool:
+        # Whether any record lacks the field
+        return any(field not in item for item in self.iter_find({}))
+
+
+class _FileLock:
+    # Exclusive across threads and processes: a re-entrant thread lock plus an flock on a
+    # sidecar file (thread lock only where fcntl is unavailable)
+    def _init_lock(self, lock_path: Path) -> None:
+        self._lock_path = lock_path
+        self._thread_lock = threading.RLock()
+        self._lock_file = None
+        self._lock_depth = 0
+
+    @contextmanager
+    def lock(self, match: Optional[Dict] = None):
+        with self._thread_lock:
+            if self._lock_depth == 0 and fcntl is not None:
+                if self._lock_file is None:
+                    self._lock_file = open(self._lock_path, 'a')
+                fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and fcntl is not None:
+                    fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+
+class JSONStorage(_FileLock, Storage):
+    def __init__(self, file_path: str, indexes: Sequence[str] = (), journal: bool = False,
+                 sync_every: int = 100, checkpoint_every: int = 10000, streaming: bool = False):
+        self.file_path = Path(file_path)
+        self.indexes = tuple(indexes)
+        self.jsonl = is_jsonl(self.file_path)
+        # Streaming storages never cache the file; every read is one pass over it
+        self.streaming = streaming
+        self.journal = journal
+        self.sync_every = sync_every
+        self.checkpoint_every = checkpoint_every
+        self._journal_path = self.file_path.with_name(self.file_path.name + ".wal")
+        self._journal_count = 0
+        self._journal_stale = False
+        self._unsynced = 0
+        self._signature = _UNLOADED
+        self._items: Dict[int, Dict] = {}
+        self._index: Dict[str, Dict[Any, Dict[int, None]]] = {}
+        self._next_key = 0
+        self._init_lock(self.file_path.with_name(self.file_path.name + ".lock"))
+        if journal:
+            atexit.register(self.sync)
+
+    def signature(self, match: Optional[Dict] = None) -> Tuple:
+        return _stat(self.file_path), _stat(self._journal_path)
+
+    def _read(self) -> List[Dict]:
+        try:
+            with open(self.file_path, 'r', encoding='utf-8') as f:
+                if self.jsonl:
+                    return list(iter_file(f, self.jsonl))
+                text = f.read()
+                metrics.count("bytes_read", len(text))
+                return json_loads(text)
+        except FileNotFoundError:
+            return []
+        except json.JSONDecodeError:
+            raise Exception("Invalid JSON data in storage file")
+        except Exception as e:
+            raise Exception(f"Failed to load data: {str(e)}")
+
+    def _write(self, items: Iterable[Dict]) -> None:
+        try:
+            if self.jsonl or not isinstance(items, list):
+                atomic_write(self.file_path, dump_records(items, self.jsonl))
+            else:
+                atomic_write(self.file_path, json_dumps(items))
+            self._journal_path.unlink(missing_ok=True)
+        except (IOError, TypeError, ValueError) as e:
+            raise Exception(f"Failed to save data: {str(e)}")
+        self._journal_count = 0
+        self._unsynced = 0
+        self._signature = self.signature()
+
+    def _refresh(self) -> None:
+        with self._thread_lock:
+            signature = self.signature()
+            if signature != self._signature:
+                self._rebuild(self._read())
+                self._journal_count = self._replay(signature[0])
+                self._signature = signature
+
+    def _open_journal(self, base: Optional[int]):
+        try:
+            f = open(self._journal_path, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            self._journal_stale = False
+            return None
+        try:
+            header = json_loads(f.readline())
+        except ValueError:
+            header = {}
+        # A journal started against an older main file was already checkpointed
+        self._journal_stale = header.get("base", -1) != base
+        if self._journal_stale:
+            f.close()
+            return None
+        return f
+
+    def _journal_records(self, base: Optional[int]) -> List[Dict]:
+        f = self._open_journal(base)
+        if f is None:
+            return []
+        records = []
+        with f:
+            for line in f:
+                try:
+                    records.append(json_loads(line))
+                except ValueError:
+                    break
+        return records
+
+    def _replay(self, base: Optional[Tuple[int, int, int]]) -> int:
+        records = self._journal_records(base[0] if base else None)
+        for record in records:
+            self._apply(record)
+        return len(records)
+
+    def _stream(self) -> Iterator[Dict]:
+        try:
+            f = open(self.file_path, 'r', encoding='utf-8')
+        except FileNotFoundError:
+            f = None
+        try:
+            # The journal must belong to the exact file being read
+            records = self._journal_records(os.fstat(f.fileno()).st_ino if f else None)
+            yield from _replay_stream(iter_file(f, self.jsonl) if f else (), records)
+        except ValueError:
+            raise Exception("Invalid JSON data in storage file")
+        finally:
+            if f is not None:
+                f.close()
+
+    def _apply(self, record: Dict) -> Optional[Dict]:
+        if record["op"] == "insert":
+            self._add(dict(record["item"]))
+            return record["item"]
+        keys = self._keys(record["match"])
+        if record["op"] == "update":
+            if not keys:
+                return None
+            updated = {**self._items[keys[0]], **record["data"]}
+            self._replace(keys[0], updated)
+            return updated
+        for key in keys:
+            self._remove(key)
+        return None
+
+    def _append(self, records: List[Dict]) -> None:
+        try:
+            if self._journal_stale:
+                self._journal_path.unlink(missing_ok=True)
+                self._journal_stale = False
+            with open(self._journal_path, 'a', encoding='utf-8') as f:
+                if f.tell() == 0:
+                    self._journal_count = 0
+                    base = _stat(self.file_path)
+                    f.write(json_dumps({"base": base[0] if base else None}) + "\n")
+                text = "".join(json_dumps(record) + "\n" for record in records)
+                f.write(text)
+                f.flush()
+                metrics.count("bytes_written", len(text))
+                self._unsynced += len(records)
+                if self.sync_every and self._unsynced >= self.sync_every:
+                    os.fsync(f.fileno())
+                    self._unsynced = 0
+        except (IOError, TypeError, ValueError) as e:
+            raise Exception(f"Failed to save data: {str(e)}")
+        self._journal_count += len(records)
+        self._signature = self.signature()
+
+    def _append_lines(self, items: List[Dict]) -> bool:
+        # JSON Lines files take new records in place, unless a journal must replay first
+        if not self.jsonl or self._journal_path.exists():
+            return False
+        try:
+            with open(self.file_path, 'ab+') as f:
+                if f.tell():
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        return False
+                data = "".join(json_dumps(item) + "\n" for item in items).encode('utf-8')
+                f.write(data)
+                f.flush()
+                metrics.count("bytes_written", len(data))
+                os.fsync(f.fileno())
+        except (IOError, TypeError, ValueError) as e:
+            raise Exception(f"Failed to save data: {str(e)}")
+        return True
+
+    @staticmethod
+    def _inserted(records: List[Dict]) -> Optional[List[Dict]]:
+        if all(record["op"] == "insert" for record in records):
+            return [record["item"] for record in records]
+        return None
+
+    def _commit(self, records: List[Dict]) -> None:
+        if self.journal:
+            self._append(records)
+            if self.checkpoint_every and self._journal_count >= self.checkpoint_every:
+                self._flush()
+            return
+        items = self._inserted(records)
+        if items is not None and self._append_lines(items):
+            self._signature = self.signature()
+        else:
+            self._flush()
+
+    def _commit_stream(self, records: List[Dict]) -> None:
+        if self.journal:
+            if self.checkpoint_every:
+                base = _stat(self.file_path)
+                # Count what earlier processes journaled too, or short-lived ones never checkpoint
+                self._journal_count = len(self._journal_records(base[0] if base else None))
+            self._append(records)
+            if self.checkpoint_every and self._journal_count >= self.checkpoint_every:
+                self._write(self._stream())
+            return
+        items = self._inserted(records)
+        if items is None or not self._append_lines(items):
+            self._write(_replay_stream(self._stream(), records))
+
+    @contextmanager
+    def bulk(self):
+        # Writes inside go to the journal, and the file is rewritten once at the end rather than
+        # per commit. JSON Lines files already take inserts in place
+        if self.jsonl:
+            yield
+            return
+        journal, checkpoint_every = self.journal, self.checkpoint_every
+        self.journal, self.checkpoint_every = True, 0
+        try:
+            yield
+        finally:
+            self.journal, self.checkpoint_every = journal, checkpoint_every
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        with self.lock():
+            if self.streaming:
+                if self._journal_path.exists():
+                    self._write(self._stream())
+                return
+            self._refresh()
+            if self._journal_count:
+                self._flush()
+
+    def sync(self) -> None:
+        with self.lock():
+            if not self._unsynced:
+                return
+            try:
+                with open(self._journal_path, 'a', encoding='utf-8') as f:
+                    os.fsync(f.fileno())
+            except FileNotFoundError:
+                pass
+            self._unsynced = 0
+
+    def _rebuild(self, items: List[Dict]) -> None:
+        self._items = {}
+        self._index = {field: {} for field in self.indexes}
+        self._next_key = 0
+        for item in items:
+            self._add(item)
+
+    def _add(self, item: Dict) -> None:
+        key = self._next_key
+        self._next_key += 1
+        self._items[key] = item
+        for field, index in self._index.items():
+            index.setdefault(item.get(field), {})[key] = None
+
+    def _unindex(self, key: int, item: Dict) -> None:
+        for field, index in self._index.items():
+            keys = index[item.get(field)]
+            del keys[key]
+            if not keys:
+                del index[item.get(field)]
+
+    def _remove(self, key: int) -> Dict:
+        item = self._items.pop(key)
+        self._unindex(key, item)
+        return item
+
+    def _replace(self, key: int, item: Dict) -> None:
+        old = self._items[key]
+        self._items[key] = item
+        for field, index in self._index.items():
+            if old.get(field) == item.get(field):
+                continue
+            keys = index[old.get(field)]
+            del keys[key]
+            if not keys:
+                del index[old.get(field)]
+            index.setdefault(item.get(field), {})[key] = None
+
+    def _keys(self, match: Dict) -> List[int]:
+        field = next((f for f in match if f in self._index), None)
+        if field is None:
+            keys = self._items
+        else:
+            keys = self._index[field].get(match[field], {})
+        return [key for key in keys if _matches(self._items[key], match)]
+
+    def _flush(self) -> None:
+        self._write(list(self._items.values()))
+
+    def load(self) -> List[Dict]:
+        if self.streaming:
+            return list(self._stream())
+        with self._thread_lock:
+            self._refresh()
+            return [dict(item) for item in self._items.values()]
+
+    def save(self, items: Iterable[Dict]) -> None:
+        with self.lock():
+            if self.streaming:
+                self._write(items)
+                return
+            items = list(items)
+            self._write(items)
+            self._rebuild([dict(item) for item in items])
+
+    def find(self, match: Dict) -> List[Dict]:
+        if self.streaming:
+            return list(self.iter_find(match))
+        with self._thread_lock:
+            self._refresh()
+            return [dict(self._items[key]) for key in self._keys(match)]
+
+    def iter_find(self, match: Dict) -> Iterator[Dict]:
+        if not self.streaming:
+            return super().iter_find(match)
+        return (item for item in self._stream() if _matches(item, match))
+
+    def insert(self, item: Dict) -> None:
+        self.insert_many([item])
+
+    def insert_many(self, items: List[Dict]) -> None:
+        records = [{"op": "insert", "item": item} for item in items]
+        if not records:
+            return
+        with self.lock():
+            if self.streaming:
+                self._commit_stream(records)
+                return
+            self._refresh()
+            for record in records:
+                self._apply(record)
+            self._commit(records)
+
+    def update(self, match: Dict, updated_data: Dict) -> Optional[Dict]:
+        record = {"op": "update", "match": match, "data": updated_data}
+        with self.lock():
+            if self.streaming:
+                current = next(self.iter_find(match), None)
+                if current is None:
+                    return None
+                self._commit_stream([record])
+                return {**current, **updated_data}
+            self._refresh()
+            updated = self._apply(record)
+            if updated is None:
+                return None
+            self._commit([record])
+            return dict(updated)
+
+    def delete(self, match: Dict) -> int:
+        record = {"op": "delete", "match": match}
+        with self.lock():
+            if self.streaming:
+                count = sum(1 for _ in self.iter_find(match))
+                if count:
+                    self._commit_stream([record])
+                return count
+            self._refresh()
+            count = len(self._keys(match))
+            if count:
+                self._apply(record)
+                self._commit([record])
+            return count
+
+    def delete_many(self, field: str, values: Iterable[Any]) -> int:
+        # One rewrite for the whole set rather than one per value
+        values = set(values)
+        with self.lock():
+            kept, removed = [], 0
+            for item in self.iter_find({}):
+                if item.get(field) in values:
+                    removed += 1
+                else:
+                    kept.append(item)
+            if removed:
+                self.save(kept)
+            return removed
+
+
+class MappedStorage(JSONStorage):
+    # A JSON Lines file read through mmap; only line offsets and index keys stay in memory
+    def __init__(self, file_path: str, indexes: Sequence[str] = ()):
+        super().__init__(file_path, indexes)
+        self.jsonl = True
+        # Line start/end byte offsets, one pair per record
+        self._starts = array('q')
+        self._ends = array('q')
+        self._keys_by: Dict[str, Dict[Any, List[int]]] = {}
+        self._map: Optional[mmap.mmap] = None
+
+    def _open_map(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        try:
+            with open(self.file_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size:
+                    self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            pass
+
+    def _refresh(self) -> None:
+        with self._thread_lock:
+            signature = self.signature()
+            if signature != self._signature:
+                try:
+                    self._scan()
+                except ValueError:
+                    raise Exception("Invalid JSON data in storage file")
+                self._signature = signature
+
+    def _scan(self) -> None:
+        self._open_map()
+        self._starts = array('q')
+        self._ends = array('q')
+        self._keys_by = {field: {} for field in self.indexes}
+        self._scan_from(0)
+
+    def _scan_from(self, pos: int) -> None:
+        data = self._map
+        if data is None:
+            return
+        metrics.count("bytes_read", len(data) - pos)
+        while pos < len(data):
+            end = data.find(b"\n", pos)
+            if end == -1:
+                # A torn final line is an append that never finished
+                break
+            if end > pos:
+                self._index_line(pos, end, json_loads(data[pos:end]))
+            pos = end + 1
+
+    def _index_line(self, start: int, end: int, item: Dict) -> None:
+        key = len(self._starts)
+        self._starts.append(start)
+        self._ends.append(end)
+        for field, index in self._keys_by.items():
+            index.setdefault(item.get(field), []).append(key)
+
+    def _item(self, key: int) -> Dict:
+        start, end = self._starts[key], self._ends[key]
+        if metrics.active:
+            metrics.count("bytes_read", end - start)
+        return json_loads(self._map[start:end])
+
+    def _matching(self, match: Dict) -> List[Tuple[int, Dict]]:
+        field = next((f for f in match if f in self._keys_by), None)
+        if field is None:
+            keys = range(len(self._starts))
+        else:
+            keys = self._keys_by[field].get(match[field], [])
+        items = ((key, self._item(key)) for key in keys)
+        return [(key, item) for key, item in items if _matches(item, match)]
+
+    def _rewrite(self, changes: Dict[int, Optional[Dict]], appended: Sequence[Dict] = ()) -> None:
+        def lines() -> Iterator[str]:
+            for key, (start, end) in enumerate(zip(self._starts, self._ends)):
+                if key not in changes:
+                    yield self._map[start:end + 1].decode('utf-8')
+                elif changes[key] is not None:
+                    yield json_dumps(changes[key]) + "\n"
+            for item in appended:
+                yield json_dumps(item) + "\n"
+
+        try:
+            atomic_write(self.file_path, lines())
+        except (IOError, TypeError, ValueError) as e:
+            raise Exception(f"Failed to save data: {str(e)}")
+        self._signature = _UNLOADED
+
+    def load(self) -> List[Dict]:
+        with self._thread_lock:
+            self._refresh()
+            return [self._item(key) for key in range(len(self._starts))]
+
+    def save(self, items: Iterable[Dict]) -> None:
+        with self.lock():
+            self._write(items)
+            self._signature = _UNLOADED
+
+    def find(self, match: Dict) -> List[Dict]:
+        with self._thread_lock:
+            self._refresh()
+            return [item for _, item in self._matching(match)]
+
+    def insert(self, item: Dict) -> None:
+        self.insert_many([item])
+
+    def insert_many(self, items: List[Dict]) -> None:
+        if not items:
+            return
+        with self.lock():
+            self._refresh()
+            start = len(self._map) if self._map is not None else 0
+            if not self._append_lines(items):
+                self._rewrite({}, items)
+                return
+            # Index only the appended lines instead of rescanning the file
+            self._open_map()
+            self._scan_from(start)
+            self._signature = self.signature()
+
+    def update(self, match: Dict, updated_data: Dict) -> Optional[Dict]:
+        with self.lock():
+            self._refresh()
+            matches = self._matching(match)
+            if not matches:
+                return None
+            key, item = matches[0]
+            updated = {**item, **updated_data}
+            self._rewrite({key: updated})
+            return updated
+
+    def delete(self, match: Dict) -> int:
+        with self.lock():
+            self._refresh()
+            matches = self._matching(match)
+            if matches:
+                self._rewrite({key: None for key, _ in matches})
+            return len(matches)
+
+
+class ShardedStorage(Storage):
+    # Records are spread over JSON Lines shards by a hash of one field, so work
+    # scoped to one value of that field reads and locks a single shard
+    def __init__(self, directory: str, shard_field: str, shards: int = 64,
+                 indexes: Sequence[str] = ()):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.shard_field = shard_field
+        self.indexes = tuple(indexes)
+        self.created = self._write_manifest(shards)
+        # The shard count of an existing layout wins, or records would be looked up in the wrong shard
+        with open(self.directory / "manifest.json", 'r', encoding='utf-8') as f:
+            self.shard_count = json_loads(f.read())["shards"]
+        self._shards: Dict[int, MappedStorage] = {}
+        self._guard = threading.Lock()
+
+    def _write_manifest(self, shards: int) -> bool:
+        tmp_path = self.directory / f".manifest.{os.getpid()}.{threading.get_ident()}"
+        atomic_write(tmp_path, json_dumps({"field": self.shard_field, "shards": shards}))
+        try:
+            os.link(tmp_path, self.directory / "manifest.json")
+            return True
+        except FileExistsError:
+            return False
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    def _number(self, value: Any) -> int:
+        digest = hashlib.blake2b(str(value).encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'big') % self.shard_count
+
+    def _shard(self, number: int) -> MappedStorage:
+        with self._guard:
+            shard = self._shards.get(number)
+            if shard is None:
+                shard = MappedStorage(self.directory / f"{number:04d}.jsonl", self.indexes)
+                self._shards[number] = shard
+            return shard
+
+    def shard_for(self, value: Any) -> MappedStorage:
+        return self._shard(self._number(value))
+
+    def _targets(self, match: Optional[Dict]) -> List[MappedStorage]:
+        if match and self.shard_field in match:
+            return [self.shard_for(match[self.shard_field])]
+        return [self._shard(number) for number in range(self.shard_count)]
+
+    @contextmanager
+    def lock(self, match: Optional[Dict] = None):
+        # Shards are always taken in number order, so whole-layout locks can't deadlock
+        with ExitStack() as stack:
+            for shard in self._targets(match):
+                stack.enter_context(shard.lock())
+            yield
+
+    def signature(self, match: Optional[Dict] = None) -> Tuple:
+        return tuple(shard.signature() for shard in self._targets(match))
+
+    def partitions(self, match: Optional[Dict] = None) -> List[Storage]:
+        return list(self._targets(match))
+
+    def load(self) -> List[Dict]:
+        return [item for shard in self._targets(None) for item in shard.load()]
+
+    def save(self, items: Iterable[Dict]) -> None:
+        groups: Dict[int, List[Dict]] = {}
+        for item in items:
+            groups.setdefault(self._number(item.get(self.shard_field)), []).append(item)
+        with self.lock():
+            for number in range(self.shard_count):
+                shard = self._shard(number)
+                if number in groups or shard.file_path.exists():
+                    shard.save(groups.get(number, []))
+
+    def find(self, match: Dict) -> List[Dict]:
+        return [item for shard in self._targets(match) for item in shard.find(match)]
+
+    def iter_find(self, match: Dict) -> Iterator[Dict]:
+        return (item for shard in self._targets(match) for item in shard.find(match))
+
+    def insert(self, item: Dict) -> None:
+        self.shard_for(item.get(self.shard_field)).insert(item)
+
+    def insert_many(self, items: List[Dict]) -> None:
+        groups: Dict[int, List[Dict]] = {}
+        for item in items:
+            groups.setdefault(self._number(item.get(self.shard_field)), []).append(item)
+        for number in sorted(groups):
+            self._shard(number).insert_many(groups[number])
+
+    def update(self, match: Dict, updated_data: Dict) -> Optional[Dict]:
+        if self.shard_field in updated_data:
+            raise ValueError(f"Cannot change {self.shard_field} of a sharded record")
+        for shard in self._targets(match):
+            updated = shard.update(match, updated_data)
+            if updated is not None:
+                return updated
+        return None
+
+    def delete(self, match: Dict) -> int:
+        return sum(shard.delete(match) for shard in self._targets(match))
+
+
+class SQLiteStorage(_FileLock, Storage):
+    def __init__(self, file_path: str, table: str, indexes: Sequence[str] = ()):
+        for name in (table, *indexes):
+            if not name.isidentifier():
+                raise ValueError(f"Invalid storage identifier: {name}")
+        self.file_path = Path(file_path)
+        self.table = table
+        self.indexes = tuple(indexes)
+        self._conn = None
+        # lock() makes read-modify-write sequences exclusive across processes, as the JSON
+        # storages do; its thread lock also serializes use of the one shared connection
+        self._init_lock(self.file_path.with_name(self.file_path.name + ".lock"))
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            try:
+                conn = sqlite3.connect(self.file_path, timeout=30, isolation_level=None,
+                                       check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute("PRAGMA synchronous=NORMAL")
+                self._conn = conn
+                with self._transaction():
+                    conn.execute(
+                        f"CREATE TABLE IF NOT EXISTS {self.table} "
+                        "(pk INTEGER PRIMARY KEY AUTOINCREMENT, data TEXT NOT NULL)"
+                    )
+                    for field in self.indexes:
+                        conn.execute(
+                            f"CREATE INDEX IF NOT EXISTS idx_{self.table}_{field} "
+                            f"ON {self.table}(json_extract(data, '$.{field}'))"
+                        )
+            except sqlite3.Error as e:
+                self._conn = None
+                raise Exception(f"Failed to open storage: {str(e)}")
+        return self._conn
+
+    @contextmanager
+    def _transaction(self):
+        with self._thread_lock:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def signature(self, match: Optional[Dict] = None) -> Tuple[int, int]:
+        with self._thread_lock:
+            conn = self._connect()
+            return conn.execute("PRAGMA data_version").fetchone()[0], conn.total_changes
+
+    def _where(self, match: Dict):
+        for field in match:
+            if not field.isidentifier():
+                raise ValueError(f"Invalid storage identifier: {field}")
+        clause = " AND ".join(f"json_extract(data, '$.{field}') = ?" for field in match)
+        return (f" WHERE {clause}" if clause else ""), list(match.values())
+
+    def load(self) -> List[Dict]:
+        try:
+            with self._thread_lock:
+                rows = self._connect().execute(f"SELECT data FROM {self.table} ORDER BY pk")
+                return [json_loads(data) for (data,) in rows]
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to load data: {str(e)}")
+
+    def save(self, items: List[Dict]) -> None:
+        try:
+            with self._transaction() as conn:
+                conn.execute(f"DELETE FROM {self.table}")
+                conn.executemany(
+                    f"INSERT INTO {self.table} (data) VALUES (?)",
+                    ((json_dumps(item),) for item in items)
+                )
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            raise Exception(f"Failed to save data: {str(e)}")
+
+    def find(self, match: Dict) -> List[Dict]:
+        where, params = self._where(match)
+        try:
+            with self._thread_lock:
+                rows = self._connect().execute(
+                    f"SELECT data FROM {self.table}{where} ORDER BY pk", params
+                )
+                return [json_loads(data) for (data,) in rows]
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to load data: {str(e)}")
+
+    def missing(self, field: str) -> bool:
+        if not field.isidentifier():
+            raise ValueError(f"Invalid storage identifier: {field}")
+        try:
+            with self._thread_lock:
+                return self._connect().execute(
+                    f"SELECT 1 FROM {self.table} "
+                    f"WHERE json_extract(data, '$.{field}') IS NULL LIMIT 1"
+                ).fetchone() is not None
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to load data: {str(e)}")
+
+    def insert(self, item: Dict) -> None:
+        self.insert_many([item])
+
+    def insert_many(self, items: List[Dict]) -> None:
+        try:
+            with self._transaction() as conn:
+                conn.executemany(f"INSERT INTO {self.table} (data) VALUES (?)",
+                                 ((json_dumps(item),) for item in items))
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            raise Exception(f"Failed to save data: {str(e)}")
+
+    def update(self, match: Dict, updated_data: Dict) -> Optional[Dict]:
+        where, params = self._where(match)
+        try:
+            with self._transaction() as conn:
+                row = conn.execute(
+                    f"SELECT pk, data FROM {self.table}{where} ORDER BY pk LIMIT 1", params
+                ).fetchone()
+                if row is None:
+                    return None
+                updated = {**json_loads(row[1]), **updated_data}
+                conn.execute(
+                    f"UPDATE {self.table} SET data = ? WHERE pk = ?",
+                    (json_dumps(updated), row[0])
+                )
+                return updated
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            raise Exception(f"Failed to save data: {str(e)}")
+
+    def delete(self, match: Dict) -> int:
+        where, params = self._where(match)
+        try:
+            with self._transaction() as conn:
+                return conn.execute(f"DELETE FROM {self.table}{where}", params).rowcount
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to save data: {str(e)}")
+
+    def delete_many(self, field: str, values: Iterable[Any]) -> int:
+        where, _ = self._where({field: None})
+        try:
+            with self._transaction() as conn:
+                return sum(conn.execute(f"DELETE FROM {self.table}{where}", (value,)).rowcount
+                           for value in values)
+        except sqlite3.Error as e:
+            raise Exception(f"Failed to save data: {str(e)}")
+
+
+def create_storage(file_path: str, indexes: Sequence[str] = (),
+                   backend: Optional[str] = None, shard_field: Optional[str] = None) -> Storage:
+    file_path = Path(file_path).resolve()
+    backend = (backend or os.environ.get(STORAGE_BACKEND_ENV, "json")).lower()
+    shards = int(os.environ.get(SHARDS_ENV, "0") or 0) if shard_field else 0
+    if backend == "json" and shards:
+        backend = "sharded"
+    if backend == "json" and os.environ.get(JSON_FORMAT_ENV, "").lower() == "jsonl":
+        file_path = file_path.with_suffix(JSONL_SUFFIX)
+    key = (backend, file_path, tuple(indexes), shard_field)
+    if key not in _STORAGES:
+        if backend == "sharded":
+            if not shard_field:
+                raise ValueError(f"{file_path.name} has no shard field")
+            storage = ShardedStorage(file_path.with_suffix(".shards"), shard_field,
+                                     shards or 64, indexes)
+            # A new layout starts from the single-file data it replaces
+            if storage.created:
+                for legacy in (file_path, file_path.with_suffix(JSONL_SUFFIX)):
+                    if legacy.exists():
+                        storage.save(JSONStorage(legacy, streaming=True).iter_find({}))
+                        break
+            _STORAGES[key] = storage
+        elif backend == "json":
+            journal = _env_flag(JOURNAL_ENV)
+            sync_every = int(os.environ.get(JOURNAL_SYNC_ENV, "100"))
+            _STORAGES[key] = JSONStorage(file_path, indexes, journal, sync_every,
+                                         streaming=_env_flag(STREAMING_ENV))
+        elif backend == "sqlite":
+            _STORAGES[key] = SQLiteStorage(file_path.with_suffix(".db"), file_path.stem, indexes)
+        else:
+            raise ValueError(f"Unknown storage backend: {backend}")
+    return _STORAGES[key]
+
+
+def migrate_json_to_sqlite(json_path: str, indexes: Sequence[str] = (),
+                           overwrite: bool = False) -> int:
+    source = JSONStorage(json_path)
+    target = create_storage(json_path, indexes, backend="sqlite")
+    if target.load() and not overwrite:
+        raise Exception(f"{target.file_path} already contains data")
+    items = source.load()
+    target.save(items)
+    return len(items)
+
+
+def convert_json(source_path: str, target_path: str, overwrite: bool = False) -> int:
+    # Array JSON <-> JSON Lines, picked by suffix; the source is streamed, journal included
+    source = JSONStorage(source_path, streaming=True)
+    if Path(target_path).exists() and not overwrite:
+        raise Exception(f"{target_path} already exists")
+    count = 0
+
+    def counted(items: Iterable[Dict]) -> Iterator[Dict]:
+        nonlocal count
+        for item in items:
+            count += 1
+            yield item
+
+    with source.lock():
+        write_records(target_path, counted(source.iter_find({})))
+    return count
+
+
+if __name__ == "__main__":
+    import sys
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Migrate JSON data files to SQLite storage")
+    parser.add_argument("files", nargs="*", default=["data/users.json", "data/tasks.json"])
+    parser.add_argument("--overwrite", action="store_true")
+    parser.add_argument("--convert", metavar="TARGET",
+                        help="convert one JSON file to TARGET (.json array or .jsonl) instead")
+    args = parser.parse_args()
+
+    if args.convert:
+        if len(args.files) != 1:
+            parser.error("--convert takes exactly one source file")
+        count = convert_json(args.files[0], args.convert, overwrite=args.overwrite)
+        print(f"Converted {count} records from {args.files[0]} to {args.convert}")
+        sys.exit(0)
+
+    for path in args.files:
+        count = migrate_json_to_sqlite(path, overwrite=args.overwrite)
+        print(f"Migrated {count} records from {path} to {Path(path).with_suffix('.db')}")
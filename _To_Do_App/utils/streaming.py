@@ -0,0 +1,165 @@
+import io
+import os
+import gzip
+import json
+import threading
+from pathlib import Path
+from typing import Dict, IO, Iterable, Iterator, Union
+from utils import metrics
+from utils.helpers import json_dumps, json_loads
+
+CHUNK_SIZE = 1 << 16
+WRITE_BATCH = 1000
+JSONL_SUFFIX = ".jsonl"
+GZIP_SUFFIX = ".gz"
+GZIP_LEVEL = 6
+
+
+def is_gzip(file_path: Union[str, Path]) -> bool:
+    return Path(file_path).suffix == GZIP_SUFFIX
+
+
+def is_jsonl(file_path: Union[str, Path]) -> bool:
+    # "tasks.jsonl.gz" is compressed JSON Lines
+    path = Path(file_path)
+    return (path.with_suffix("") if is_gzip(path) else path).suffix == JSONL_SUFFIX
+
+
+def iter_json_array(f: IO[str], chunk_size: int = CHUNK_SIZE) -> Iterator[Dict]:
+    decoder = json.JSONDecoder()
+    buffer, pos, eof = "", 0, False
+
+    def read() -> str:
+        chunk = f.read(chunk_size)
+        metrics.count("bytes_read", len(chunk))
+        return chunk
+
+    # start -> "[" -> first (value or "]") -> sep ("," or "]") -> item (value) -> sep ...
+    state = "start"
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n":
+            pos += 1
+        if pos == len(buffer):
+            if eof:
+                if state == "start":
+                    return
+                raise json.JSONDecodeError("Unterminated array", buffer, pos)
+            buffer, pos = read(), 0
+            eof = not buffer
+            continue
+
+        char = buffer[pos]
+        if state == "start":
+            if char != "[":
+                raise json.JSONDecodeError("Expecting '['", buffer, pos)
+            pos += 1
+            state = "first"
+        elif char == "]" and state in ("first", "sep"):
+            return
+        elif state == "sep":
+            if char != ",":
+                raise json.JSONDecodeError("Expecting ',' delimiter", buffer, pos)
+            pos += 1
+            state = "item"
+        else:
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                # The value runs past the buffer; keep its start and read more
+                chunk = read()
+                eof = not chunk
+                buffer, pos = buffer[pos:] + chunk, 0
+                continue
+            yield item
+            pos = end
+            state = "sep"
+
+
+def iter_jsonl(f: IO[str]) -> Iterator[Dict]:
+    for line in f:
+        if metrics.active:
+            metrics.count("bytes_read", len(line))
+        if not line.strip():
+            continue
+        try:
+            yield json_loads(line)
+        except ValueError:
+            # A torn final line is an append that never finished
+            if line.endswith("\n"):
+                raise
+            return
+
+
+def iter_file(f: IO[str], jsonl: bool) -> Iterator[Dict]:
+    return iter_jsonl(f) if jsonl else iter_json_array(f)
+
+
+def iter_records(file_path: Union[str, Path]) -> Iterator[Dict]:
+    try:
+        if is_gzip(file_path):
+            f = gzip.open(file_path, 'rt', encoding='utf-8')
+        else:
+            f = open(file_path, 'r', encoding='utf-8')
+    except FileNotFoundError:
+        return
+    with f:
+        yield from iter_file(f, is_jsonl(file_path))
+
+
+def dump_records(records: Iterable[Dict], jsonl: bool) -> Iterator[str]:
+    batch = []
+    first = True
+    if not jsonl:
+        yield "["
+    for record in records:
+        text = json_dumps(record)
+        batch.append(text + "\n" if jsonl else text if first else "," + text)
+        first = False
+        if len(batch) >= WRITE_BATCH:
+            yield "".join(batch)
+            batch = []
+    if batch:
+        yield "".join(batch)
+    if not jsonl:
+        yield "]"
+
+
+def _fsync_dir(directory: Path) -> None:
+    if os.name != "posix":
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(file_path: Path, text: Union[str, Iterable[str]]) -> None:
+    file_path = Path(file_path)
+    tmp_path = file_path.with_name(f".{file_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, 'wb') as raw:
+            stream = (gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=GZIP_LEVEL, mtime=0)
+                      if is_gzip(file_path) else raw)
+            f = io.TextIOWrapper(stream, encoding='utf-8')
+            for chunk in ([text] if isinstance(text, str) else text):
+                f.write(chunk)
+                metrics.count("bytes_written", len(chunk))
+            f.flush()
+            # Detached so finishing the gzip member (its trailer) leaves the file open for fsync
+            f.detach()
+            if stream is not raw:
+                stream.close()
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(tmp_path, file_path)
+        _fsync_dir(file_path.parent)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def write_records(file_path: Union[str, Path], records: Iterable[Dict]) -> None:
+    atomic_write(Path(file_path), dump_records(records, is_jsonl(file_path)))